@@ -15,13 +15,47 @@ class Settings:
     DB_PORT: str = os.getenv("DB_PORT", "5432")
     DB_NAME: str = os.getenv("DB_NAME")
     
+    # Database connection pool settings (shared by central and plant engines)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 20))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 40))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_QUERY_CACHE_SIZE: int = int(os.getenv("DB_QUERY_CACHE_SIZE", 1200))
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 1024))
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", 256))
+    # Set when DB_HOST/plant hosts point at PgBouncer in transaction pooling mode
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+    
     # Redis settings
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
+    REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))
+    SESSION_LIST_CACHE_TTL: int = int(os.getenv("SESSION_LIST_CACHE_TTL", 30))
+    SESSION_LIST_ETAG_TTL: int = int(os.getenv("SESSION_LIST_ETAG_TTL", 30))
+    SESSION_LIST_MAX_AGE: int = int(os.getenv("SESSION_LIST_MAX_AGE", 10))
+    # Recommendation schemas (graph pairs + latest values) reused for repeated advice requests
+    RECOMMENDATION_SCHEMA_CACHE_TTL: int = int(os.getenv("RECOMMENDATION_SCHEMA_CACHE_TTL", 30))
+    # Total size in bytes of the formatted chat history messages kept in process memory
+    HISTORY_FORMAT_CACHE_MAX_BYTES: int = int(os.getenv("HISTORY_FORMAT_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    
+    # AI agent endpoints (chat messages and manual/advisor requests)
+    AI_AGENT_CHAT_URL: str = os.getenv("AI_AGENT_CHAT_URL", "http://38.128.233.128:8000/ai-agent/chat")
+    AI_AGENT_MANUAL_URL: str = os.getenv("AI_AGENT_MANUAL_URL", "http://38.128.233.128:8000/ai-agent/manual")
+    # Timeouts (seconds) of the shared AI agent client; AI_AGENT_TOTAL_TIMEOUT bounds a whole manual request
+    AI_AGENT_CONNECT_TIMEOUT: float = float(os.getenv("AI_AGENT_CONNECT_TIMEOUT", 5.0))
+    AI_AGENT_READ_TIMEOUT: float = float(os.getenv("AI_AGENT_READ_TIMEOUT", 180.0))
+    AI_AGENT_WRITE_TIMEOUT: float = float(os.getenv("AI_AGENT_WRITE_TIMEOUT", 10.0))
+    AI_AGENT_POOL_TIMEOUT: float = float(os.getenv("AI_AGENT_POOL_TIMEOUT", 5.0))
+    AI_AGENT_TOTAL_TIMEOUT: float = float(os.getenv("AI_AGENT_TOTAL_TIMEOUT", 185.0))
+    # Read/write/pool timeout of chat requests, which override the shared client's defaults
+    AI_AGENT_CHAT_TIMEOUT: float = float(os.getenv("AI_AGENT_CHAT_TIMEOUT", 1000.0))
     
     # JWT settings
     JWT_SECRET: str = os.getenv("JWT_SECRET", "your_secret_key")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+    AUTH_TOKEN_CACHE_TTL: int = int(os.getenv("AUTH_TOKEN_CACHE_TTL", 300))
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
     
     # Central Neo4j settings (for system-wide operations) - Optional
     # Note: This is not used in the current architecture
@@ -7,6 +7,8 @@ from fastapi import Header, HTTPException, Depends
 from typing import Optional, AsyncGenerator, Dict, Tuple
 from sqlalchemy import text
 import asyncio
+import uuid
+import orjson
 from neo4j import AsyncGraphDatabase, AsyncSession as Neo4jAsyncSession
 from core.config import settings as core_settings
 
@@ -16,8 +18,44 @@ logger = setup_logger(__name__)
 # DATABASE ENGINES
 # =============================================================================
 
+def _asyncpg_connect_args() -> dict:
+    """asyncpg connect args; server-side prepared statement caches are disabled behind PgBouncer"""
+    if settings.DB_PGBOUNCER:
+        # Transaction pooling hands each transaction to any backend, so prepared
+        # statements must not be cached and need names unique across clients
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__"
+        }
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+    }
+
+def _json_serializer(value) -> str:
+    """Serializer for JSON columns (artifact_metadata, ...); orjson instead of json.dumps"""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def create_pooled_engine(db_url: str):
+    """Create an async engine with a pre-sized connection pool and asyncpg statement caches"""
+    return create_async_engine(
+        db_url,
+        echo=False,
+        future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        json_serializer=_json_serializer,
+        json_deserializer=orjson.loads,
+        connect_args=_asyncpg_connect_args()
+    )
+
 # Central Database Engine - for users, plants, permissions
-central_engine = create_async_engine(settings.CENTRAL_DATABASE_URL, echo=False, future=True)
+central_engine = create_pooled_engine(settings.CENTRAL_DATABASE_URL)
 logger.info(f"Central Database initialized")
 CentralSessionLocal = async_sessionmaker(central_engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -64,7 +102,7 @@ async def get_plant_engine(plant_id: str) -> Tuple:
                 raise HTTPException(status_code=500, detail=str(e))
             
             # Create database engine and session maker
-            engine = create_async_engine(db_url, echo=False, future=True)
+            engine = create_pooled_engine(db_url)
             session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
             
             # Cache the engine and session maker
@@ -345,6 +383,8 @@ async def init_plant_db(plant_id: str):
     try:
         engine, _ = await get_plant_engine(plant_id)
         async with engine.begin() as conn:
+            # Trigram operator classes used by the search indexes
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
             await conn.run_sync(PlantBase.metadata.create_all)
             logger.success(f"Plant {plant_id} database tables created")
     except Exception as e:
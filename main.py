@@ -1,19 +1,29 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from routers.endpoints import router
 from routers.query_endpoint import query_router
 from database import init_db, check_db_health, get_active_plants
-from utils.log import setup_logger
+from utils.log import setup_logger, start_log_listener, stop_log_listener
+from utils.cache import close_redis
+from utils.http_client import close_http_client, warm_up_http_client
+from core.config import settings
 from utils.response import success_response, fail_response
+from middlewares.error_middleware import UnhandledErrorMiddleware
 
 logger = setup_logger(__name__)
 
 app = FastAPI(
     title="AI Agent Microservices",
     description="Multi-plant AI agent service with dynamic database management",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Added first so it is the innermost middleware: error responses still get the CORS headers
+app.add_middleware(UnhandledErrorMiddleware)
+
 # Set up CORS
 app.add_middleware(
     CORSMiddleware,
@@ -23,20 +33,40 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Compress JSON bodies over 1 KB (session/artifact lists shrink several times) for clients sending Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 app.include_router(router, prefix="/api/v1")
 app.include_router(query_router, prefix="/api/v1")
 
+# Services raise ValueError for missing or inaccessible resources, so it maps to 404 here instead of
+# a try/except in every handler. Other unhandled errors become a 500 in UnhandledErrorMiddleware,
+# and HTTPException keeps FastAPI's own handler.
+@app.exception_handler(ValueError)
+async def value_error_handler(request: Request, exc: ValueError):
+    logger.warning(f"Not found on {request.method} {request.url.path}: {exc}")
+    return fail_response(message=str(exc), status_code=404)
+
 @app.on_event("startup")
 async def startup_event():
     try:
+        start_log_listener()
         logger.info("Starting up the application...")
         # Initialize central and plant databases
         await init_db()
         logger.success("Databases initialized")
+        await warm_up_http_client(settings.AI_AGENT_MANUAL_URL)
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
         raise e
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Shutting down the application...")
+    await close_redis()
+    await close_http_client()
+    stop_log_listener()
+
 @app.get("/")
 async def root():
     return success_response(message="Welcome to AI-Agent Microservices v2.0")
@@ -2,8 +2,9 @@ import jwt as pyjwt #type: ignore
 from fastapi import HTTPException, Security, WebSocket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import os
+import time
 from utils.log import setup_logger
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from utils.response import fail_response
 from core.config import settings
 
@@ -19,6 +20,32 @@ if not JWT_SECRET or not JWT_ALGORITHM:
 
 security = HTTPBearer()
 
+# Verified token payloads, keyed by the raw token: {token: (expires_at, payload)}.
+# Entries live for min(token exp - now, AUTH_TOKEN_CACHE_TTL) seconds so repeated
+# requests with the same bearer token skip the signature check.
+_token_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+def _verify_token_cached(token: str) -> Dict[str, Any]:
+    """Verify a JWT token, reusing the payload of a previous successful verification"""
+    now = time.time()
+    cached = _token_cache.get(token)
+    if cached is not None:
+        expires_at, payload = cached
+        if expires_at > now:
+            return payload
+        _token_cache.pop(token, None)
+    
+    payload = verify_token(token)
+    ttl = settings.AUTH_TOKEN_CACHE_TTL
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - now)
+    if ttl > 0:
+        # Evict the oldest entry once the cache is full
+        if len(_token_cache) >= settings.AUTH_TOKEN_CACHE_SIZE:
+            _token_cache.pop(next(iter(_token_cache)), None)
+        _token_cache[token] = (now + ttl, payload)
+    return payload
+
 def verify_token(token: str) -> Dict[str, Any]:
     """
     Verify JWT token and return payload.
@@ -57,7 +84,7 @@ async def authenticate_user(token: HTTPAuthorizationCredentials = Security(secur
     FastAPI dependency to authenticate a user from an HTTP request with a Bearer token.
     Returns the JWT payload containing user information.
     """
-    payload = verify_token(token.credentials)
+    payload = _verify_token_cached(token.credentials)
     logger.info(f"User authenticated: {payload.get('user_id')}")
     return payload
 
@@ -0,0 +1,39 @@
+from utils.log import setup_logger
+from utils.response import fail_response
+
+logger = setup_logger(__name__)
+
+class UnhandledErrorMiddleware:
+    """
+    Turn exceptions escaping an endpoint into the standard 500 fail envelope.
+
+    An app-level exception_handler(Exception) runs in Starlette's ServerErrorMiddleware, outside
+    every user middleware, so its response would miss the CORS headers and browsers would report a
+    CORS failure instead of the error. This middleware is added before CORSMiddleware, which makes
+    it the innermost one and keeps the error response inside the CORS layer.
+    Plain ASGI rather than BaseHTTPMiddleware, so successful requests only pay for one wrapper call.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            # Once headers are sent (e.g. a streamed body failing midway) the status can no longer change
+            if response_started:
+                raise
+            logger.error(f"Unhandled error on {scope['method']} {scope['path']}: {exc}")
+            await fail_response(message=str(exc), status_code=500)(scope, receive, send)
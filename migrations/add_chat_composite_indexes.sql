@@ -0,0 +1,16 @@
+-- Migration: Add composite indexes matching chat query predicates
+-- Date: 2026-10-16
+-- Description: Lets session history and starred-session lists use index seeks instead of scan + sort
+
+-- Session history: WHERE session_id = ? ORDER BY created_at (and the latest message per session)
+CREATE INDEX IF NOT EXISTS idx_chat_messages_session_created
+ON chat_messages(session_id, created_at DESC);
+
+-- Starred sessions: WHERE user_id = ? AND is_starred ORDER BY updated_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_starred_updated_id
+ON chat_sessions(user_id, updated_at DESC, id DESC)
+WHERE is_starred;
+
+-- Add comments to document the changes
+COMMENT ON INDEX idx_chat_messages_session_created IS 'Ordered message lookup per chat session';
+COMMENT ON INDEX idx_chat_sessions_user_starred_updated_id IS 'Partial index for starred session lists';
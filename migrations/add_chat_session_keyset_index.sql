@@ -0,0 +1,10 @@
+-- Migration: Add composite index for keyset pagination of chat sessions
+-- Date: 2026-10-16
+-- Description: Supports seeking on (updated_at, id) per user instead of OFFSET scans
+
+-- Composite index matching ORDER BY updated_at DESC, id DESC filtered by user_id
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_updated_id
+ON chat_sessions(user_id, updated_at DESC, id DESC);
+
+-- Add a comment to document the change
+COMMENT ON INDEX idx_chat_sessions_user_updated_id IS 'Keyset pagination index for user session lists';
@@ -0,0 +1,23 @@
+-- Migration: Denormalize the last message onto chat_sessions
+-- Date: 2026-10-16
+-- Description: Lets session lists and get_last_message avoid a per-session lookup on chat_messages
+
+-- Add the new columns
+ALTER TABLE chat_sessions
+ADD COLUMN IF NOT EXISTS last_message_id INTEGER,
+ADD COLUMN IF NOT EXISTS last_message_at TIMESTAMP;
+
+-- Backfill existing sessions with their newest message
+UPDATE chat_sessions cs
+SET last_message_id = lm.id,
+    last_message_at = lm.created_at
+FROM (
+    SELECT DISTINCT ON (session_id) session_id, id, created_at
+    FROM chat_messages
+    ORDER BY session_id, created_at DESC
+) lm
+WHERE lm.session_id = cs.session_id;
+
+-- Add comments to document the changes
+COMMENT ON COLUMN chat_sessions.last_message_id IS 'Id of the newest chat message in the session';
+COMMENT ON COLUMN chat_sessions.last_message_at IS 'Creation time of the newest chat message in the session';
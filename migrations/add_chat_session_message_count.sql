@@ -0,0 +1,20 @@
+-- Migration: Denormalize the message count onto chat_sessions
+-- Date: 2026-10-16
+-- Description: Lets session lists return message_count without counting chat_messages per session
+
+-- Add the new column
+ALTER TABLE chat_sessions
+ADD COLUMN IF NOT EXISTS message_count INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill existing sessions
+UPDATE chat_sessions cs
+SET message_count = mc.cnt
+FROM (
+    SELECT session_id, COUNT(*) AS cnt
+    FROM chat_messages
+    GROUP BY session_id
+) mc
+WHERE mc.session_id = cs.session_id;
+
+-- Add a comment to document the change
+COMMENT ON COLUMN chat_sessions.message_count IS 'Number of chat messages in the session';
@@ -0,0 +1,22 @@
+-- Migration: Add trigram indexes for substring search
+-- Date: 2026-10-16
+-- Description: Lets ILIKE '%term%' searches on sessions and artifacts use GIN index lookups instead of sequential scans
+
+-- Trigram operator classes
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Session search: chat_name ILIKE '%term%'
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_chat_name_trgm
+ON chat_sessions USING gin (chat_name gin_trgm_ops);
+
+-- Artifact search: title ILIKE '%term%' OR content ILIKE '%term%'
+CREATE INDEX IF NOT EXISTS idx_artifacts_title_trgm
+ON artifacts USING gin (title gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_artifacts_content_trgm
+ON artifacts USING gin (content gin_trgm_ops);
+
+-- Add comments to document the changes
+COMMENT ON INDEX idx_chat_sessions_chat_name_trgm IS 'Trigram index for session name search';
+COMMENT ON INDEX idx_artifacts_title_trgm IS 'Trigram index for artifact title search';
+COMMENT ON INDEX idx_artifacts_content_trgm IS 'Trigram index for artifact content search';
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint, PrimaryKeyConstraint, Index, Table, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint, PrimaryKeyConstraint, Index, Table, Boolean, Text, text
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 from sqlalchemy.sql import func
@@ -243,6 +243,9 @@ class Artifacts(PlantBase, BaseModel):
         Index('idx_artifacts_artifact_type', 'artifact_type'),
         Index('idx_artifacts_is_active', 'is_active'),
         Index('idx_artifacts_message_id', 'message_id'),
+        Index('idx_artifacts_user_updated_id', 'user_id', 'updated_at', 'id'),
+        Index('idx_artifacts_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        Index('idx_artifacts_content_trgm', 'content', postgresql_using='gin', postgresql_ops={'content': 'gin_trgm_ops'}),
     )
     
     # Relationships
@@ -260,12 +263,18 @@ class ChatSession(PlantBase, BaseModel):
     user_name = Column(String, nullable=True)  # Cache for display
     chat_name = Column(String, nullable=True)  # User-defined name for the chat session
     is_starred = Column(Boolean, default=False, nullable=False)  # Whether the chat session is starred/favorited
+    last_message_id = Column(Integer, nullable=True)  # References chat_messages.id (no FK constraint), kept in sync by create_chat_message
+    last_message_at = Column(DateTime, nullable=True)  # created_at of the last message, denormalized for session lists
+    message_count = Column(Integer, default=0, nullable=False)  # Number of messages, kept in sync by create_chat_message/delete_chat_message
     
     __table_args__ = (
         Index('idx_chat_sessions_user_id', 'user_id'),
         Index('idx_chat_sessions_session_id', 'session_id'),
         Index('idx_chat_sessions_is_starred', 'is_starred'),
         Index('idx_chat_sessions_updated_at', 'updated_at'),
+        Index('idx_chat_sessions_user_updated_id', 'user_id', 'updated_at', 'id'),
+        Index('idx_chat_sessions_user_starred_updated_id', 'user_id', 'updated_at', 'id', postgresql_where=text('is_starred')),
+        Index('idx_chat_sessions_chat_name_trgm', 'chat_name', postgresql_using='gin', postgresql_ops={'chat_name': 'gin_trgm_ops'}),
     )
     
     # Relationships
@@ -297,9 +306,23 @@ class ChatMessage(PlantBase, BaseModel):
     # Relationship
     session = relationship("ChatSession", back_populates="messages")
     
+    @property
+    def created_at_iso(self) -> str:
+        """ISO-8601 created_at, formatted once and cached on the instance"""
+        created_at_iso = self.__dict__.get("_created_at_iso")
+        if created_at_iso is None:
+            created_at = self.created_at
+            created_at_iso = created_at.isoformat() if isinstance(created_at, datetime) else str(created_at)
+            self.__dict__["_created_at_iso"] = created_at_iso
+        return created_at_iso
+    
     def __repr__(self):
         return f"<ChatMessage(id={self.id}, session_id={self.session_id})>"
 
+# Declared after the class because created_at comes from the BaseModel mixin, so the column object needed
+# for .desc() only exists on the mapped class. Matches migrations/add_chat_composite_indexes.sql.
+Index('idx_chat_messages_session_created', ChatMessage.session_id, ChatMessage.created_at.desc())
+
 # =============================================================================
 # WORKSPACE-SCOPED OPERATIONAL DATA
 # =============================================================================
@@ -1,12 +1,28 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import select, update, delete, func, tuple_
 from sqlalchemy.orm import selectinload
 from models.plant_models import Artifacts, ChatSession
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncGenerator
+import datetime
 from utils.log import setup_logger
 
 logger = setup_logger(__name__)
 
+# Rows per server-side cursor batch when streaming artifacts (content can be large)
+ARTIFACTS_YIELD_PER = 50
+
+def _paginate_user_artifacts(query, skip: int, limit: int, after_updated_at: Optional[datetime.datetime] = None, after_id: Optional[int] = None):
+    """
+    Apply ordering and pagination to a user-wide Artifacts select.
+    Uses a keyset seek on (updated_at, id) when a cursor is provided, otherwise falls back to OFFSET.
+    """
+    query = query.order_by(Artifacts.updated_at.desc(), Artifacts.id.desc())
+    if after_updated_at is not None and after_id is not None:
+        query = query.where(tuple_(Artifacts.updated_at, Artifacts.id) < tuple_(after_updated_at, after_id))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
 async def create_artifact(
     db: AsyncSession,
     session_id: str,
@@ -29,8 +45,8 @@ async def create_artifact(
             message_id=message_id
         )
         db.add(artifact)
+        # Sessions use expire_on_commit=False and all defaults are client-side, so no refresh is needed
         await db.commit()
-        await db.refresh(artifact)
         logger.success(f"Created artifact {artifact.id} for session {session_id}")
         return artifact
     except Exception as e:
@@ -38,6 +54,22 @@ async def create_artifact(
         await db.rollback()
         return None
 
+async def create_artifacts(
+    db: AsyncSession,
+    artifacts_data: List[Dict[str, Any]]
+) -> List[Artifacts]:
+    """Create several artifacts in one transaction (each dict holds the create_artifact keyword arguments)"""
+    try:
+        artifacts = [Artifacts(**artifact_data) for artifact_data in artifacts_data]
+        db.add_all(artifacts)
+        await db.commit()
+        logger.success(f"Created {len(artifacts)} artifacts")
+        return artifacts
+    except Exception as e:
+        logger.error(f"Error creating artifacts: {e}")
+        await db.rollback()
+        return []
+
 async def get_artifact_by_id(
     db: AsyncSession,
     artifact_id: int,
@@ -197,27 +229,6 @@ async def get_artifacts_by_type(
         logger.error(f"Error getting {artifact_type} artifacts for session {session_id}: {e}")
         return []
 
-async def get_all_user_artifacts(
-    db: AsyncSession,
-    user_id: int,
-    skip: int = 0,
-    limit: int = 100
-) -> List[Artifacts]:
-    """Get all artifacts for a user across all sessions"""
-    try:
-        query = select(Artifacts).where(
-            Artifacts.user_id == user_id,
-            Artifacts.is_active == True
-        ).order_by(Artifacts.created_at.desc()).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        artifacts = result.scalars().all()
-        logger.info(f"Retrieved {len(artifacts)} artifacts for user {user_id}")
-        return list(artifacts)
-    except Exception as e:
-        logger.error(f"Error getting all artifacts for user {user_id}: {e}")
-        return []
-
 async def get_user_artifacts_count(
     db: AsyncSession,
     user_id: int
@@ -235,52 +246,46 @@ async def get_user_artifacts_count(
         logger.error(f"Error getting artifacts count for user {user_id}: {e}")
         return 0
 
-async def get_user_artifacts_by_type(
-    db: AsyncSession,
-    user_id: int,
-    artifact_type: str,
-    skip: int = 0,
-    limit: int = 100
-) -> List[Artifacts]:
-    """Get user artifacts by type across all sessions"""
-    try:
-        query = select(Artifacts).where(
-            Artifacts.user_id == user_id,
-            Artifacts.artifact_type == artifact_type,
-            Artifacts.is_active == True
-        ).order_by(Artifacts.created_at.desc()).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        artifacts = result.scalars().all()
-        logger.info(f"Retrieved {len(artifacts)} {artifact_type} artifacts for user {user_id}")
-        return list(artifacts)
-    except Exception as e:
-        logger.error(f"Error getting {artifact_type} artifacts for user {user_id}: {e}")
-        return []
+def _user_artifacts_select(user_id: int, artifact_type: Optional[str] = None, search_term: Optional[str] = None):
+    """Select the active artifacts of a user, optionally of one type and/or with search_term in title or content"""
+    query = select(Artifacts).where(
+        Artifacts.user_id == user_id,
+        Artifacts.is_active == True
+    )
+    if artifact_type is not None:
+        query = query.where(Artifacts.artifact_type == artifact_type)
+    if search_term is not None:
+        query = query.where(
+            Artifacts.title.ilike(f"%{search_term}%") | 
+            Artifacts.content.ilike(f"%{search_term}%")
+        )
+    return query
 
-async def search_user_artifacts(
+async def stream_user_artifacts(
     db: AsyncSession,
     user_id: int,
-    search_term: str,
     skip: int = 0,
-    limit: int = 100
-) -> List[Artifacts]:
-    """Search user artifacts across all sessions"""
+    limit: int = 100,
+    after_updated_at: Optional[datetime.datetime] = None,
+    after_id: Optional[int] = None,
+    artifact_type: Optional[str] = None,
+    search_term: Optional[str] = None
+) -> AsyncGenerator[Artifacts, None]:
+    """
+    Stream user artifacts across all sessions, optionally filtered by type and/or search term.
+    
+    Rows are fetched in batches of ARTIFACTS_YIELD_PER through a server-side cursor,
+    so a page of large artifacts is never fully loaded into memory.
+    """
     try:
-        query = select(Artifacts).where(
-            Artifacts.user_id == user_id,
-            Artifacts.is_active == True,
-            (Artifacts.title.ilike(f"%{search_term}%") | 
-             Artifacts.content.ilike(f"%{search_term}%"))
-        ).order_by(Artifacts.created_at.desc()).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        artifacts = result.scalars().all()
-        logger.info(f"Found {len(artifacts)} artifacts matching '{search_term}' for user {user_id}")
-        return list(artifacts)
+        query = _user_artifacts_select(user_id, artifact_type, search_term)
+        query = _paginate_user_artifacts(query, skip, limit, after_updated_at, after_id).execution_options(yield_per=ARTIFACTS_YIELD_PER)
+        result = await db.stream_scalars(query)
+        async for artifact in result:
+            yield artifact
     except Exception as e:
-        logger.error(f"Error searching artifacts for user {user_id}: {e}")
-        return []
+        logger.error(f"Error streaming artifacts for user {user_id}: {e}")
+        raise e
 
 async def search_artifacts(
     db: AsyncSession,
@@ -1,12 +1,15 @@
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, case
 from sqlalchemy.ext.asyncio import AsyncSession
-from models.plant_models import ChatMessage
+from models.plant_models import ChatMessage, ChatSession
 from utils.log import setup_logger
-from typing import List, Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncGenerator, Tuple
 import json
 
 logger = setup_logger(__name__)
 
+# Number of rows fetched per round-trip when streaming a session's messages
+MESSAGES_YIELD_PER = 200
+
 def message_serializer(message):
     """
     Serialize a ChatMessage to a standardized format
@@ -22,7 +25,7 @@ def message_serializer(message):
         "id": message.id,
         "status": "success",
         "data": response_data,  # Return parsed JSON data or original response
-        "timestamp": message.created_at.isoformat() if hasattr(message.created_at, 'isoformat') else str(message.created_at)
+        "timestamp": message.created_at_iso
     }
 
 async def create_chat_message(db: AsyncSession, session_id: str, user_id: int, message: str, response: str, query: Optional[str] = None, execution_time: Optional[float] = None):
@@ -49,30 +52,50 @@ async def create_chat_message(db: AsyncSession, session_id: str, user_id: int, m
             response=response
         )
         db.add(chat_message)
+        # Flush to get the message id, then point the session at it in the same transaction
+        await db.flush()
+        await db.execute(
+            update(ChatSession)
+            .where(ChatSession.session_id == session_id)
+            .values(
+                last_message_id=chat_message.id,
+                last_message_at=chat_message.created_at,
+                updated_at=chat_message.created_at,
+                message_count=ChatSession.message_count + 1
+            )
+        )
+        # Sessions use expire_on_commit=False and all defaults are client-side, so no refresh is needed
         await db.commit()
-        await db.refresh(chat_message)
-        logger.success(f'Chat message created for session: {session_id}')
+        logger.debug('Chat message created for session: %s', session_id)
         return message_serializer(chat_message)
     except Exception as e:
         logger.error(f'Error creating chat message: {e}')
         await db.rollback()
         raise e
 
-async def get_session_messages(db: AsyncSession, session_id: str) -> List[ChatMessage]:
+async def get_session_messages(db: AsyncSession, session_id: str) -> AsyncGenerator[ChatMessage, None]:
+    """
+    Stream the messages of a session ordered by creation time.
+    
+    Rows are fetched in batches of MESSAGES_YIELD_PER through a server-side cursor,
+    so long sessions are never fully loaded into memory.
+    """
     try:
-        query = select(ChatMessage).where(ChatMessage.session_id == session_id).order_by(ChatMessage.created_at)
-        result = await db.execute(query)
-        messages = result.scalars().all()
-        logger.success(f'Chat messages retrieved for session: {session_id}')
-        return messages
+        query = select(ChatMessage).where(ChatMessage.session_id == session_id).order_by(ChatMessage.created_at).execution_options(yield_per=MESSAGES_YIELD_PER)
+        result = await db.stream_scalars(query)
+        async for message in result:
+            yield message
+        logger.success(f'Chat messages streamed for session: {session_id}')
     except Exception as e:
         logger.error(f'Error getting chat messages: {e}')
         raise e
 
 async def get_last_message(db: AsyncSession, session_id: str) -> Optional[ChatMessage]:
-
+    """Get the last message of a session through the denormalized ChatSession.last_message_id"""
     try:
-        query = select(ChatMessage).where(ChatMessage.session_id == session_id).order_by(ChatMessage.created_at.desc()).limit(1)
+        query = select(ChatMessage).join(
+            ChatSession, ChatSession.last_message_id == ChatMessage.id
+        ).where(ChatSession.session_id == session_id)
         result = await db.execute(query)
         message = result.scalar_one_or_none()
         if message:
@@ -84,7 +107,18 @@ async def get_last_message(db: AsyncSession, session_id: str) -> Optional[ChatMe
         logger.error(f'Error getting last chat message: {e}')
         raise e
 
-async def update_chat_message(db: AsyncSession, message_id: int, message: str, user_id: int) -> Optional[ChatMessage]:
+# Owner of the message's session: the user whose cached session lists a message write invalidates
+_SESSION_OWNER_ID = select(ChatSession.user_id).where(
+    ChatSession.session_id == ChatMessage.session_id
+).correlate(ChatMessage).scalar_subquery()
+
+def _latest_message_column(column):
+    """Scalar subquery selecting column of the newest message of the session being updated"""
+    return select(column).where(
+        ChatMessage.session_id == ChatSession.session_id
+    ).order_by(ChatMessage.created_at.desc()).limit(1).scalar_subquery()
+
+async def update_chat_message(db: AsyncSession, message_id: int, message: str, user_id: int) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
     """
     Update a chat message in the database
     
@@ -94,43 +128,30 @@ async def update_chat_message(db: AsyncSession, message_id: int, message: str, u
         user_id: User ID for authorization
         
     Returns:
-        Updated message object or None if not found/unauthorized
+        (serialized updated message, user_id of the session owner), or (None, None) if not found/unauthorized
     """
     try:
-        from sqlalchemy import update
-        # First check if the message exists and belongs to the user
-        query = select(ChatMessage).where(
-            ChatMessage.id == message_id,
-            ChatMessage.user_id == user_id
-        )
-        result = await db.execute(query)
-        existing_message = result.scalar_one_or_none()
-        
-        if not existing_message:
-            logger.warning(f'Message {message_id} not found or unauthorized for user {user_id}')
-            return None
-            
-        # Update the message
+        # Ownership is part of the WHERE clause, so check, update and re-read are a single statement
         update_query = update(ChatMessage).where(
             ChatMessage.id == message_id,
             ChatMessage.user_id == user_id
-        ).values(message=message)
+        ).values(message=message).returning(ChatMessage, _SESSION_OWNER_ID).execution_options(synchronize_session=False)
         
-        await db.execute(update_query)
-        await db.commit()
+        result = await db.execute(update_query)
+        row = result.first()
         
-        # Return the updated message
-        updated_query = select(ChatMessage).where(ChatMessage.id == message_id)
-        updated_result = await db.execute(updated_query)
-        updated_message = updated_result.scalar_one_or_none()
+        if row is None:
+            logger.warning(f'Message {message_id} not found or unauthorized for user {user_id}')
+            return None, None
         
+        await db.commit()
         logger.success(f'Chat message {message_id} updated successfully')
-        return message_serializer(updated_message)
+        return message_serializer(row[0]), row[1]
     except Exception as e:
         logger.error(f'Error updating chat message: {e}')
         raise e
 
-async def delete_chat_message(db: AsyncSession, message_id: int, user_id: int) -> bool:
+async def delete_chat_message(db: AsyncSession, message_id: int, user_id: int) -> Optional[int]:
     """
     Delete a chat message from the database
     
@@ -139,33 +160,41 @@ async def delete_chat_message(db: AsyncSession, message_id: int, user_id: int) -
         user_id: User ID for authorization
         
     Returns:
-        True if deleted, False if not found/unauthorized
+        user_id of the session owner if deleted, None if not found/unauthorized
     """
     try:
-        from sqlalchemy import delete
-        # First check if the message exists and belongs to the user
-        query = select(ChatMessage).where(
+        # Ownership is part of the WHERE clause, RETURNING tells whether a row matched
+        delete_query = delete(ChatMessage).where(
             ChatMessage.id == message_id,
             ChatMessage.user_id == user_id
-        )
-        result = await db.execute(query)
-        existing_message = result.scalar_one_or_none()
+        ).returning(ChatMessage.session_id).execution_options(synchronize_session=False)
         
-        if not existing_message:
+        result = await db.execute(delete_query)
+        session_id = result.scalar_one_or_none()
+        if session_id is None:
             logger.warning(f'Message {message_id} not found or unauthorized for user {user_id}')
-            return False
-            
-        # Delete the message
-        delete_query = delete(ChatMessage).where(
-            ChatMessage.id == message_id,
-            ChatMessage.user_id == user_id
-        )
+            return None
         
-        await db.execute(delete_query)
+        # One UPDATE decrements the counter and, if the deleted message was the last one, re-points
+        # the session to its newest remaining message.
+        # Keep updated_at: removing a message should not move the session in the lists
+        was_last = ChatSession.last_message_id == message_id
+        result = await db.execute(
+            update(ChatSession)
+            .where(ChatSession.session_id == session_id)
+            .values(
+                message_count=ChatSession.message_count - 1,
+                last_message_id=case((was_last, _latest_message_column(ChatMessage.id)), else_=ChatSession.last_message_id),
+                last_message_at=case((was_last, _latest_message_column(ChatMessage.created_at)), else_=ChatSession.last_message_at),
+                updated_at=ChatSession.updated_at
+            )
+            .returning(ChatSession.user_id)
+        )
+        owner_id = result.scalar_one_or_none()
         await db.commit()
         
         logger.success(f'Chat message {message_id} deleted successfully')
-        return True
+        return owner_id
     except Exception as e:
         logger.error(f'Error deleting chat message: {e}')
-        raise e
\ No newline at end of file
+        raise e
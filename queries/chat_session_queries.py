@@ -1,17 +1,78 @@
-from sqlalchemy import update, select
+from sqlalchemy import update, select, delete, tuple_, bindparam, func, or_, and_, Boolean, String
 from sqlalchemy.ext.asyncio import AsyncSession
-from models.plant_models import ChatSession
+from models.plant_models import ChatSession, ChatMessage, Artifacts
 from utils.log import setup_logger
+from typing import Optional, Tuple
 import datetime
 
 logger = setup_logger(__name__)
 
+# Update statements are built once at import time and reused with bound parameters,
+# so SQLAlchemy hits its compiled cache instead of rebuilding them per call.
+# synchronize_session=False skips evaluating the criteria against objects in the session.
+_TOUCH_SESSION_STMT = update(ChatSession).where(
+    ChatSession.session_id == bindparam("sid")
+).values(updated_at=bindparam("ts")).returning(ChatSession.user_id).execution_options(synchronize_session=False)
+
+# User-facing mutations carry the access rule (owner or admin) in their WHERE clause,
+# so permission check and write happen in one statement. RETURNING gives the session owner's user_id
+# (None when no row matched), which callers need to invalidate the owner's cached session lists
+_SESSION_ACCESS_FILTER = or_(ChatSession.user_id == bindparam("uid"), bindparam("is_admin", type_=Boolean))
+
+_STAR_SESSION_STMT = update(ChatSession).where(
+    ChatSession.session_id == bindparam("sid"), _SESSION_ACCESS_FILTER
+).values(is_starred=bindparam("starred")).returning(ChatSession.user_id).execution_options(synchronize_session=False)
+
+# NULL parameters keep the current column value, so any subset of fields is updated in one statement
+_UPDATE_SESSION_FIELDS_STMT = update(ChatSession).where(
+    ChatSession.session_id == bindparam("sid"), _SESSION_ACCESS_FILTER
+).values(
+    chat_name=func.coalesce(bindparam("name", type_=String), ChatSession.chat_name),
+    is_starred=func.coalesce(bindparam("starred", type_=Boolean), ChatSession.is_starred)
+).returning(ChatSession.user_id).execution_options(synchronize_session=False)
+
+# Set-based deletes instead of loading every child row for the ORM cascade;
+# children are only removed when the session itself passes the access filter
+_ACCESSIBLE_SESSION_ID = select(ChatSession.session_id).where(
+    ChatSession.session_id == bindparam("sid"), _SESSION_ACCESS_FILTER
+).scalar_subquery()
+
+_DELETE_SESSION_MESSAGES_STMT = delete(ChatMessage).where(
+    ChatMessage.session_id == _ACCESSIBLE_SESSION_ID
+).execution_options(synchronize_session=False)
+
+_DELETE_SESSION_ARTIFACTS_STMT = delete(Artifacts).where(
+    Artifacts.session_id == _ACCESSIBLE_SESSION_ID
+).execution_options(synchronize_session=False)
+
+_DELETE_SESSION_STMT = delete(ChatSession).where(
+    ChatSession.session_id == bindparam("sid"), _SESSION_ACCESS_FILTER
+).returning(ChatSession.user_id).execution_options(synchronize_session=False)
+
+# Session lists return (ChatSession, last message text) rows: message_count and last_message_at
+# are denormalized on the session, the last message text comes from a join on last_message_id
+_SESSION_LIST_SELECT = select(ChatSession, ChatMessage.message).outerjoin(
+    ChatMessage, ChatMessage.id == ChatSession.last_message_id
+)
+
+def _paginate_sessions(query, skip: int, limit: int, after_updated_at: Optional[datetime.datetime] = None, after_id: Optional[int] = None):
+    """
+    Apply ordering and pagination to a session list select.
+    Uses a keyset seek on (updated_at, id) when a cursor is provided, otherwise falls back to OFFSET.
+    """
+    query = query.order_by(ChatSession.updated_at.desc(), ChatSession.id.desc())
+    if after_updated_at is not None and after_id is not None:
+        query = query.where(tuple_(ChatSession.updated_at, ChatSession.id) < tuple_(after_updated_at, after_id))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
 async def create_chat_session(db: AsyncSession, session_id: str, user_id: int):
     try:
         chat_session = ChatSession(session_id=session_id, user_id=user_id)
         db.add(chat_session)
+        # Sessions use expire_on_commit=False and all defaults are client-side, so no refresh is needed
         await db.commit()
-        await db.refresh(chat_session)
         logger.info(f'Chat session created with session_id: {session_id}')
         return session_id
     except Exception as e:
@@ -27,109 +88,138 @@ async def get_chat_session(db: AsyncSession, session_id: str):
     except Exception as e:
         logger.error(f'Error getting chat session: {e}')
         raise  # Raise the exception after logging
+
+async def get_chat_session_with_latest_artifact(db: AsyncSession, session_id: str, user_id: int) -> Tuple[Optional[ChatSession], Optional[Artifacts]]:
+    """Get a session together with the user's most recent active artifact in it, in one round trip"""
+    try:
+        query = select(ChatSession, Artifacts).outerjoin(
+            Artifacts,
+            and_(
+                Artifacts.session_id == ChatSession.session_id,
+                Artifacts.user_id == user_id,
+                Artifacts.is_active == True
+            )
+        ).where(ChatSession.session_id == session_id).order_by(Artifacts.created_at.desc().nulls_last()).limit(1)
+        result = await db.execute(query)
+        row = result.first()
+        if row is None:
+            return None, None
+        return row[0], row[1]
+    except Exception as e:
+        logger.error(f'Error getting chat session with latest artifact: {e}')
+        raise  # Raise the exception after logging
     
-async def update_chat_session(db: AsyncSession, session_id: str):
+async def update_chat_session(db: AsyncSession, session_id: str) -> Optional[int]:
+    """Touch a session's updated_at; returns the owner's user_id, or None if the session does not exist"""
     try:
-        query = update(ChatSession).where(ChatSession.session_id == session_id).values(updated_at=datetime.datetime.utcnow())
-        await db.execute(query)
+        result = await db.execute(_TOUCH_SESSION_STMT, {"sid": session_id, "ts": datetime.datetime.utcnow()})
+        owner_id = result.scalar_one_or_none()
         await db.commit()  # Ensure the changes are committed
         logger.info(f'Chat session updated for session_id: {session_id}')
+        return owner_id
     except Exception as e:
         logger.error(f'Error updating chat session: {e}')
         raise  # Raise the exception after logging
 
 # get the whole session using user id
-async def get_user_sessions(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
+async def get_user_sessions(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, after_updated_at: Optional[datetime.datetime] = None, after_id: Optional[int] = None):
     try:
-        query = select(ChatSession).where(ChatSession.user_id == user_id).order_by(ChatSession.updated_at.desc()).offset(skip).limit(limit)
+        query = _SESSION_LIST_SELECT.where(ChatSession.user_id == user_id)
+        query = _paginate_sessions(query, skip, limit, after_updated_at, after_id)
         result = await db.execute(query)
-        sessions = result.scalars().all()
+        sessions = result.all()
         logger.info(f'Retrieved {len(sessions)} sessions for user: {user_id}')
         return sessions
     except Exception as e:
         logger.error(f'Error getting user sessions: {e}')
         raise  # Raise the exception after logging
 
-async def get_starred_sessions(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
+async def get_starred_sessions(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, after_updated_at: Optional[datetime.datetime] = None, after_id: Optional[int] = None):
     try:
-        query = select(ChatSession).where(
+        query = _SESSION_LIST_SELECT.where(
             ChatSession.user_id == user_id,
             ChatSession.is_starred == True
-        ).order_by(ChatSession.updated_at.desc()).offset(skip).limit(limit)
+        )
+        query = _paginate_sessions(query, skip, limit, after_updated_at, after_id)
         result = await db.execute(query)
-        sessions = result.scalars().all()
+        sessions = result.all()
         logger.info(f'Retrieved {len(sessions)} starred sessions for user: {user_id}')
         return sessions
     except Exception as e:
         logger.error(f'Error getting starred sessions: {e}')
         raise
 
-async def get_recent_sessions(db: AsyncSession, user_id: int, days: int = 7, skip: int = 0, limit: int = 100):
+async def get_recent_sessions(db: AsyncSession, user_id: int, days: int = 7, skip: int = 0, limit: int = 100, after_updated_at: Optional[datetime.datetime] = None, after_id: Optional[int] = None):
     try:
-        from datetime import datetime, timedelta
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        query = select(ChatSession).where(
+        cutoff_date = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+        query = _SESSION_LIST_SELECT.where(
             ChatSession.user_id == user_id,
             ChatSession.updated_at >= cutoff_date
-        ).order_by(ChatSession.updated_at.desc()).offset(skip).limit(limit)
+        )
+        query = _paginate_sessions(query, skip, limit, after_updated_at, after_id)
         result = await db.execute(query)
-        sessions = result.scalars().all()
+        sessions = result.all()
         logger.info(f'Retrieved {len(sessions)} recent sessions for user: {user_id}')
         return sessions
     except Exception as e:
         logger.error(f'Error getting recent sessions: {e}')
         raise
 
-async def search_sessions(db: AsyncSession, user_id: int, search_term: str, skip: int = 0, limit: int = 100):
+async def search_sessions(db: AsyncSession, user_id: int, search_term: str, skip: int = 0, limit: int = 100, after_updated_at: Optional[datetime.datetime] = None, after_id: Optional[int] = None):
     try:
-        query = select(ChatSession).where(
+        query = _SESSION_LIST_SELECT.where(
             ChatSession.user_id == user_id,
             ChatSession.chat_name.ilike(f'%{search_term}%')
-        ).order_by(ChatSession.updated_at.desc()).offset(skip).limit(limit)
+        )
+        query = _paginate_sessions(query, skip, limit, after_updated_at, after_id)
         result = await db.execute(query)
-        sessions = result.scalars().all()
+        sessions = result.all()
         logger.info(f'Found {len(sessions)} sessions matching search term: {search_term}')
         return sessions
     except Exception as e:
         logger.error(f'Error searching sessions: {e}')
         raise
 
-async def update_session_star(db: AsyncSession, session_id: str, is_starred: bool):
+async def update_session_star(db: AsyncSession, session_id: str, is_starred: bool, user_id: int, is_admin: bool = False) -> Optional[int]:
+    """Update the starred status of a session; returns the owner's user_id, or None if it does not exist or is not accessible"""
     try:
-        query = update(ChatSession).where(ChatSession.session_id == session_id).values(is_starred=is_starred)
-        await db.execute(query)
+        result = await db.execute(_STAR_SESSION_STMT, {"sid": session_id, "starred": is_starred, "uid": user_id, "is_admin": is_admin})
+        owner_id = result.scalar_one_or_none()
         await db.commit()
         logger.info(f'Session {session_id} starred status updated to: {is_starred}')
+        return owner_id
     except Exception as e:
         logger.error(f'Error updating session star status: {e}')
         raise
 
-async def update_session_name(db: AsyncSession, session_id: str, chat_name: str):
+async def update_session_fields(db: AsyncSession, session_id: str, user_id: int, is_admin: bool = False, chat_name: Optional[str] = None, is_starred: Optional[bool] = None) -> Optional[int]:
+    """Update the name and/or starred status of a session in a single UPDATE; returns the owner's user_id, or None if it does not exist or is not accessible"""
     try:
-        query = update(ChatSession).where(ChatSession.session_id == session_id).values(chat_name=chat_name)
-        await db.execute(query)
+        result = await db.execute(_UPDATE_SESSION_FIELDS_STMT, {"sid": session_id, "name": chat_name, "starred": is_starred, "uid": user_id, "is_admin": is_admin})
+        owner_id = result.scalar_one_or_none()
         await db.commit()
-        logger.info(f'Session {session_id} name updated to: {chat_name}')
+        logger.info(f'Session {session_id} fields updated (chat_name={chat_name}, is_starred={is_starred})')
+        return owner_id
     except Exception as e:
-        logger.error(f'Error updating session name: {e}')
+        logger.error(f'Error updating session fields: {e}')
         raise
 
-async def delete_session(db: AsyncSession, session_id: str):
+async def delete_session(db: AsyncSession, session_id: str, user_id: int, is_admin: bool = False) -> Optional[int]:
+    """Delete a session with its messages and artifacts; returns the owner's user_id, or None if it does not exist or is not accessible"""
     try:
-        # First get the session to ensure it exists
-        session_query = select(ChatSession).where(ChatSession.session_id == session_id)
-        result = await db.execute(session_query)
-        session = result.scalar_one_or_none()
-        
-        if not session:
-            logger.warning(f'Session {session_id} not found')
-            return False
+        params = {"sid": session_id, "uid": user_id, "is_admin": is_admin}
+        await db.execute(_DELETE_SESSION_MESSAGES_STMT, params)
+        await db.execute(_DELETE_SESSION_ARTIFACTS_STMT, params)
+        result = await db.execute(_DELETE_SESSION_STMT, params)
+        owner_id = result.scalar_one_or_none()
+        if owner_id is None:
+            await db.rollback()
+            logger.warning(f'Session {session_id} not found or not accessible')
+            return None
         
-        # Use SQLAlchemy ORM delete which respects cascade relationships
-        await db.delete(session)
         await db.commit()
         logger.info(f'Session {session_id} and all associated messages and artifacts deleted successfully')
-        return True
+        return owner_id
     except Exception as e:
         logger.error(f'Error deleting session: {e}')
         await db.rollback()
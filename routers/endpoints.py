@@ -1,7 +1,10 @@
 # api/endpoints.py
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from fastapi.exceptions import RequestValidationError
 from typing import Dict, List, Any
-from pydantic import BaseModel
+from dataclasses import dataclass
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from services.ai_agent_service import ChatService
 from services.artifact_service import ArtifactService
 from services.advisor_services import AdvisorService
@@ -10,99 +13,131 @@ from schemas.schema import (
     ResponseModel, MessageRequest, ArtifactCreateSchema, ArtifactUpdateSchema,
     ChatSessionUpdateSchema, ChatMessageUpdateSchema, ChatSearchRequestSchema, RecentChatsRequestSchema,
     RecommendationCalculationEngineSchema, AdvisorNameIdsRequestSchema, AdvisorCalcRequestWithTargetsSchema,
-    ManualAiRequestSchema, PaginatedResponseData
+    ManualAiRequestSchema, ManualAiRequest, PaginatedResponseData
 )
 from middlewares.auth_middleware import authenticate_user
 from middlewares.plant_access_middleware import validate_plant_access_middleware
-from utils.response import success_response, fail_response
+from utils.response import success_response, fail_response, stream_list_response, is_not_modified, not_modified_response, with_cache_headers
 from utils.log import setup_logger
-from utils.pagination import get_pagination_params, PaginationParams, create_paginated_response
+from utils.cache import cached_session_list, invalidate_session_lists, session_list_etag
+from utils.pagination import get_pagination_params, PaginationParams, create_paginated_response, get_keyset_params, KeysetParams, build_next_cursor
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_plant_db_with_context
+from core.config import settings
 
 logger = setup_logger(__name__)
 
 router = APIRouter(tags=["chat"])
 
+# Services keep no per-request state, so a single instance of each is shared by all requests
+_chat_service = ChatService()
+_artifact_service = ArtifactService()
+_advisor_service = AdvisorService()
+
 # Dependency to get chat service
 def get_chat_service():
-    return ChatService()
+    return _chat_service
 
 # Dependency to get artifact service
 def get_artifact_service():
-    return ArtifactService()
+    return _artifact_service
 
 # Dependency to get advisor service
 def get_advisor_service():
-    return AdvisorService()
+    return _advisor_service
+
+@dataclass
+class RequestContext:
+    """Per-request dependencies shared by every plant-scoped endpoint"""
+    auth_data: Dict[str, Any]
+    plant_context: dict
+    db: AsyncSession
+
+# Dependency bundling authentication, plant access validation and the plant DB session.
+# Access is validated before the DB session is opened, so rejected requests never check out a connection.
+async def get_request_context(
+    auth_data: Dict[str, Any] = Depends(authenticate_user),
+    plant_context: dict = Depends(validate_plant_access_middleware),
+    db: AsyncSession = Depends(get_plant_db_with_context)
+) -> RequestContext:
+    return RequestContext(auth_data=auth_data, plant_context=plant_context, db=db)
+
+def json_body(body_type: Any):
+    """
+    Dependency validating the raw request body against body_type (a model or a discriminated union of models).
+    pydantic-core parses and validates in one pass, without FastAPI building an intermediate dict first.
+    Invalid bodies still produce FastAPI's 422 response.
+    """
+    # Built once per route, not per request
+    adapter = TypeAdapter(body_type)
+    async def dependency(request: Request) -> Any:
+        try:
+            return adapter.validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False))
+    return dependency
+
+def json_body_openapi(body_type: Any) -> Dict[str, Any]:
+    """openapi_extra documenting a body read through json_body()"""
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": TypeAdapter(body_type).json_schema()}}}}
 
 @router.post("/session", status_code=status.HTTP_201_CREATED, response_model=ResponseModel)
 async def create_chat_session(
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Create a new chat session"""
-    try:
-        session_id = await chat_service.create_session(db=db, user_id=auth_data.get("user_id"))
-        return success_response(data={"session_id": session_id}, message="Session created", status_code=201)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    session_id = await chat_service.create_session(db=ctx.db, user_id=ctx.auth_data.get("user_id"))
+    await invalidate_session_lists(ctx.plant_context["plant_id"], ctx.auth_data.get("user_id"))
+    return success_response(data={"session_id": session_id}, message="Session created", status_code=201)
 
-@router.get("/session/{session_id}/history", response_model=ResponseModel)
+@router.get("/session/{session_id}/history")
 async def get_chat_history(
     session_id: str,
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
-    """Get the chat history for a session"""
-    try:
-        history = await chat_service.get_session_history(db=db, session_id=session_id, auth_data=auth_data)
-        return success_response(data=history, message="History fetched successfully")
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    """Get the chat history for a session, streamed as NDJSON (one message per line)"""
+    history = await chat_service.get_session_history(
+        db=ctx.db,
+        session_id=session_id,
+        auth_data=ctx.auth_data,
+        plant_id=ctx.plant_context["plant_id"]
+    )
+    return StreamingResponse(history, media_type="application/x-ndjson")
 
 @router.post("/session/{session_id}/message", response_model=ResponseModel)
 async def send_message(
     session_id: str, 
     request: MessageRequest,
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Send a message to the chat session and get a response"""
-    try:
-        response = await chat_service.send_message(
-            db=db,
-            session_id=session_id,
-            message=request.input_message,
-            auth_data=auth_data,
-            plant_context=plant_context
-        )
-        return success_response(data=response, message="Message sent successfully")
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    response, owner_id = await chat_service.send_message(
+        db=ctx.db,
+        session_id=session_id,
+        message=request.input_message,
+        auth_data=ctx.auth_data,
+        plant_context=ctx.plant_context
+    )
+    if owner_id is not None:
+        # The session may belong to another user (admin or shared access): the lists to drop are the owner's
+        await invalidate_session_lists(ctx.plant_context["plant_id"], owner_id)
+    return success_response(data=response, message="Message sent successfully")
 
 @router.get("/session/{session_id}", response_model=ResponseModel)
 async def get_session_info(
     session_id: str,
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Get information about a chat session"""
     try:
-        info = await chat_service.get_session_info(db=db, session_id=session_id, auth_data=auth_data)
+        info = await chat_service.get_session_info(db=ctx.db, session_id=session_id, auth_data=ctx.auth_data)
         return success_response(data=info, message="Session info fetched successfully")
     except ValueError as e:
         return fail_response(message=str(e), status_code=404)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
     
 @router.get("/diagnostics/ai-connection", response_model=ResponseModel)
 async def diagnose_ai_connection(url: Any = None):
@@ -123,129 +158,104 @@ async def create_artifact(
     session_id: str,
     artifact_data: ArtifactCreateSchema,
     artifact_service: ArtifactService = Depends(get_artifact_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Create a new artifact"""
-    try:
-        # Override session_id from URL parameter
-        artifact_data.session_id = session_id
-        
-        artifact = await artifact_service.create_artifact(
-            db=db,
-            artifact_data=artifact_data,
-            user_id=auth_data.get("user_id"),
-            auth_data=auth_data
-        )
-        
-        if artifact:
-            return success_response(data=artifact, message="Artifact created successfully", status_code=201)
-        else:
-            return fail_response(message="Failed to create artifact", status_code=400)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    # Override session_id from URL parameter
+    artifact_data.session_id = session_id
+    
+    artifact = await artifact_service.create_artifact(
+        db=ctx.db,
+        artifact_data=artifact_data,
+        user_id=ctx.auth_data.get("user_id"),
+        auth_data=ctx.auth_data
+    )
+    
+    if artifact:
+        return success_response(data=artifact, message="Artifact created successfully", status_code=201)
+    else:
+        return fail_response(message="Failed to create artifact", status_code=400)
 
 @router.get("/session/{session_id}/artifacts", response_model=ResponseModel)
 async def get_session_artifacts(
     session_id: str,
     pagination: PaginationParams = Depends(get_pagination_params),
     artifact_service: ArtifactService = Depends(get_artifact_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Get all artifacts for a session"""
-    try:
-        result = await artifact_service.get_session_artifacts(
-            db=db,
-            session_id=session_id,
-            user_id=auth_data.get("user_id"),
-            auth_data=auth_data,
-            skip=pagination.skip,
-            limit=pagination.limit
-        )
-        
-        if result is not None:
-            return success_response(data=result, message="Artifacts retrieved successfully")
-        else:
-            return fail_response(message="Access denied or session not found", status_code=403)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    result = await artifact_service.get_session_artifacts(
+        db=ctx.db,
+        session_id=session_id,
+        user_id=ctx.auth_data.get("user_id"),
+        auth_data=ctx.auth_data,
+        skip=pagination.skip,
+        limit=pagination.limit
+    )
+    
+    if result is not None:
+        return success_response(data=result, message="Artifacts retrieved successfully")
+    else:
+        return fail_response(message="Access denied or session not found", status_code=403)
 
 @router.get("/artifacts/{artifact_id}", response_model=ResponseModel)
 async def get_artifact(
     artifact_id: int,
     artifact_service: ArtifactService = Depends(get_artifact_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Get a specific artifact by ID"""
-    try:
-        artifact = await artifact_service.get_artifact(
-            db=db,
-            artifact_id=artifact_id,
-            user_id=auth_data.get("user_id"),
-            auth_data=auth_data
-        )
-        
-        if artifact:
-            return success_response(data=artifact, message="Artifact retrieved successfully")
-        else:
-            return fail_response(message="Artifact not found or access denied", status_code=404)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    artifact = await artifact_service.get_artifact(
+        db=ctx.db,
+        artifact_id=artifact_id,
+        user_id=ctx.auth_data.get("user_id"),
+        auth_data=ctx.auth_data
+    )
+    
+    if artifact:
+        return success_response(data=artifact, message="Artifact retrieved successfully")
+    else:
+        return fail_response(message="Artifact not found or access denied", status_code=404)
 
 @router.put("/artifacts/{artifact_id}", response_model=ResponseModel)
 async def update_artifact(
     artifact_id: int,
     update_data: ArtifactUpdateSchema,
     artifact_service: ArtifactService = Depends(get_artifact_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Update an artifact"""
-    try:
-        artifact = await artifact_service.update_artifact(
-            db=db,
-            artifact_id=artifact_id,
-            user_id=auth_data.get("user_id"),
-            update_data=update_data,
-            auth_data=auth_data
-        )
-        
-        if artifact:
-            return success_response(data=artifact, message="Artifact updated successfully")
-        else:
-            return fail_response(message="Artifact not found or access denied", status_code=404)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    artifact = await artifact_service.update_artifact(
+        db=ctx.db,
+        artifact_id=artifact_id,
+        user_id=ctx.auth_data.get("user_id"),
+        update_data=update_data,
+        auth_data=ctx.auth_data
+    )
+    
+    if artifact:
+        return success_response(data=artifact, message="Artifact updated successfully")
+    else:
+        return fail_response(message="Artifact not found or access denied", status_code=404)
 
 @router.delete("/artifacts/{artifact_id}", response_model=ResponseModel)
 async def delete_artifact(
     artifact_id: int,
     artifact_service: ArtifactService = Depends(get_artifact_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Delete an artifact"""
-    try:
-        success = await artifact_service.delete_artifact(
-            db=db,
-            artifact_id=artifact_id,
-            user_id=auth_data.get("user_id"),
-            auth_data=auth_data
-        )
-        
-        if success:
-            return success_response(message="Artifact deleted successfully")
-        else:
-            return fail_response(message="Artifact not found or access denied", status_code=404)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    success = await artifact_service.delete_artifact(
+        db=ctx.db,
+        artifact_id=artifact_id,
+        user_id=ctx.auth_data.get("user_id"),
+        auth_data=ctx.auth_data
+    )
+    
+    if success:
+        return success_response(message="Artifact deleted successfully")
+    else:
+        return fail_response(message="Artifact not found or access denied", status_code=404)
 
 @router.get("/session/{session_id}/artifacts/search", response_model=ResponseModel)
 async def search_artifacts(
@@ -253,28 +263,23 @@ async def search_artifacts(
     q: str,
     pagination: PaginationParams = Depends(get_pagination_params),
     artifact_service: ArtifactService = Depends(get_artifact_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Search artifacts in a session"""
-    try:
-        artifacts = await artifact_service.search_artifacts(
-            db=db,
-            session_id=session_id,
-            user_id=auth_data.get("user_id"),
-            search_term=q,
-            auth_data=auth_data,
-            skip=pagination.skip,
-            limit=pagination.limit
-        )
-        
-        if artifacts is not None:
-            return success_response(data={"artifacts": artifacts, "search_term": q}, message="Search completed successfully")
-        else:
-            return fail_response(message="Access denied or session not found", status_code=403)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    artifacts = await artifact_service.search_artifacts(
+        db=ctx.db,
+        session_id=session_id,
+        user_id=ctx.auth_data.get("user_id"),
+        search_term=q,
+        auth_data=ctx.auth_data,
+        skip=pagination.skip,
+        limit=pagination.limit
+    )
+    
+    if artifacts is not None:
+        return success_response(data={"artifacts": artifacts, "search_term": q}, message="Search completed successfully")
+    else:
+        return fail_response(message="Access denied or session not found", status_code=403)
 
 # =============================================================================
 # USER ARTIFACTS ENDPOINTS (across all sessions)
@@ -283,81 +288,74 @@ async def search_artifacts(
 @router.get("/user/artifacts", response_model=ResponseModel)
 async def get_all_user_artifacts(
     pagination: PaginationParams = Depends(get_pagination_params),
+    cursor: KeysetParams = Depends(get_keyset_params),
     artifact_service: ArtifactService = Depends(get_artifact_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
-    """Get all artifacts for the authenticated user across all sessions"""
-    try:
-        result = await artifact_service.get_all_user_artifacts(
-            db=db,
-            user_id=auth_data.get("user_id"),
-            auth_data=auth_data,
-            skip=pagination.skip,
-            limit=pagination.limit
-        )
-        
-        if result:
-            return success_response(data=result, message="User artifacts retrieved successfully")
-        else:
-            return fail_response(message="Failed to retrieve user artifacts", status_code=500)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    """Get all artifacts for the authenticated user across all sessions, streamed row by row"""
+    user_id = ctx.auth_data.get("user_id")
+    total_count = await artifact_service.get_user_artifacts_count(ctx.db, user_id)
+    artifacts = artifact_service.stream_user_artifacts(
+        plant_id=ctx.plant_context["plant_id"],
+        user_id=user_id,
+        skip=pagination.skip,
+        limit=pagination.limit,
+        after_updated_at=cursor.after_updated_at,
+        after_id=cursor.after_id
+    )
+    return await stream_list_response(
+        "artifacts", artifacts, pagination.limit,
+        extra={"total_count": total_count, "user_id": user_id},
+        message="User artifacts retrieved successfully"
+    )
 
 @router.get("/user/artifacts/type/{artifact_type}", response_model=ResponseModel)
 async def get_user_artifacts_by_type(
     artifact_type: str,
     pagination: PaginationParams = Depends(get_pagination_params),
+    cursor: KeysetParams = Depends(get_keyset_params),
     artifact_service: ArtifactService = Depends(get_artifact_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
-    """Get user artifacts by type across all sessions"""
-    try:
-        artifacts = await artifact_service.get_user_artifacts_by_type(
-            db=db,
-            user_id=auth_data.get("user_id"),
-            artifact_type=artifact_type,
-            auth_data=auth_data,
-            skip=pagination.skip,
-            limit=pagination.limit
-        )
-        
-        if artifacts is not None:
-            return success_response(data={"artifacts": artifacts, "artifact_type": artifact_type}, message="User artifacts by type retrieved successfully")
-        else:
-            return fail_response(message="Failed to retrieve user artifacts by type", status_code=500)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    """Get user artifacts by type across all sessions, streamed row by row"""
+    artifacts = artifact_service.stream_user_artifacts(
+        plant_id=ctx.plant_context["plant_id"],
+        user_id=ctx.auth_data.get("user_id"),
+        skip=pagination.skip,
+        limit=pagination.limit,
+        after_updated_at=cursor.after_updated_at,
+        after_id=cursor.after_id,
+        artifact_type=artifact_type
+    )
+    return await stream_list_response(
+        "artifacts", artifacts, pagination.limit,
+        extra={"artifact_type": artifact_type},
+        message="User artifacts by type retrieved successfully"
+    )
 
 @router.get("/user/artifacts/search", response_model=ResponseModel)
 async def search_user_artifacts(
     q: str,
     pagination: PaginationParams = Depends(get_pagination_params),
+    cursor: KeysetParams = Depends(get_keyset_params),
     artifact_service: ArtifactService = Depends(get_artifact_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
-    """Search user artifacts across all sessions"""
-    try:
-        artifacts = await artifact_service.search_user_artifacts(
-            db=db,
-            user_id=auth_data.get("user_id"),
-            search_term=q,
-            auth_data=auth_data,
-            skip=pagination.skip,
-            limit=pagination.limit
-        )
-        
-        if artifacts is not None:
-            return success_response(data={"artifacts": artifacts, "search_term": q}, message="User artifacts search completed successfully")
-        else:
-            return fail_response(message="Failed to search user artifacts", status_code=500)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    """Search user artifacts across all sessions, streamed row by row"""
+    artifacts = artifact_service.stream_user_artifacts(
+        plant_id=ctx.plant_context["plant_id"],
+        user_id=ctx.auth_data.get("user_id"),
+        skip=pagination.skip,
+        limit=pagination.limit,
+        after_updated_at=cursor.after_updated_at,
+        after_id=cursor.after_id,
+        search_term=q
+    )
+    return await stream_list_response(
+        "artifacts", artifacts, pagination.limit,
+        extra={"search_term": q},
+        message="User artifacts search completed successfully"
+    )
 
 # =============================================================================
 # CHAT SESSION MANAGEMENT ENDPOINTS
@@ -365,256 +363,256 @@ async def search_user_artifacts(
 
 @router.get("/user/sessions", response_model=ResponseModel)
 async def get_all_user_sessions(
+    request: Request,
     pagination: PaginationParams = Depends(get_pagination_params),
+    cursor: KeysetParams = Depends(get_keyset_params),
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Get all chat sessions for the logged-in user"""
-    try:
-        sessions = await chat_service.get_user_sessions(
-            db=db,
-            user_id=auth_data.get("user_id"),
+    user_id = ctx.auth_data.get("user_id")
+    plant_id = ctx.plant_context["plant_id"]
+    parts = (pagination.skip, pagination.limit, cursor.after_updated_at, cursor.after_id)
+    etag = await session_list_etag(plant_id, user_id, "all", *parts)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, settings.SESSION_LIST_MAX_AGE)
+    sessions = await cached_session_list(
+        plant_id, user_id, "all", parts,
+        lambda: chat_service.get_user_sessions(
+            db=ctx.db,
+            user_id=user_id,
             skip=pagination.skip,
-            limit=pagination.limit
-        )
-        return success_response(
-            data={
-                "sessions": sessions,
-                "total_count": len(sessions),
-                "skip": pagination.skip,
-                "limit": pagination.limit
-            },
-            message="User sessions retrieved successfully"
+            limit=pagination.limit,
+            after_updated_at=cursor.after_updated_at,
+            after_id=cursor.after_id
         )
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    )
+    return with_cache_headers(success_response(
+        data={
+            "sessions": sessions,
+            "skip": pagination.skip,
+            "limit": pagination.limit,
+            "next_cursor": build_next_cursor(sessions, pagination.limit)
+        },
+        message="User sessions retrieved successfully"
+    ), etag, settings.SESSION_LIST_MAX_AGE)
 
 @router.get("/user/sessions/starred", response_model=ResponseModel)
 async def get_starred_sessions(
+    request: Request,
     pagination: PaginationParams = Depends(get_pagination_params),
+    cursor: KeysetParams = Depends(get_keyset_params),
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Get starred chat sessions for the logged-in user"""
-    try:
-        sessions = await chat_service.get_starred_sessions(
-            db=db,
-            user_id=auth_data.get("user_id"),
+    user_id = ctx.auth_data.get("user_id")
+    plant_id = ctx.plant_context["plant_id"]
+    parts = (pagination.skip, pagination.limit, cursor.after_updated_at, cursor.after_id)
+    etag = await session_list_etag(plant_id, user_id, "starred", *parts)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, settings.SESSION_LIST_MAX_AGE)
+    sessions = await cached_session_list(
+        plant_id, user_id, "starred", parts,
+        lambda: chat_service.get_starred_sessions(
+            db=ctx.db,
+            user_id=user_id,
             skip=pagination.skip,
-            limit=pagination.limit
+            limit=pagination.limit,
+            after_updated_at=cursor.after_updated_at,
+            after_id=cursor.after_id
         )
-        return success_response(
-            data={
-                "sessions": sessions,
-                "total_count": len(sessions),
-                "skip": pagination.skip,
-                "limit": pagination.limit
-            },
-            message="Starred sessions retrieved successfully"
-        )
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    )
+    return with_cache_headers(success_response(
+        data={
+            "sessions": sessions,
+            "skip": pagination.skip,
+            "limit": pagination.limit,
+            "next_cursor": build_next_cursor(sessions, pagination.limit)
+        },
+        message="Starred sessions retrieved successfully"
+    ), etag, settings.SESSION_LIST_MAX_AGE)
 
 @router.get("/user/sessions/recent", response_model=ResponseModel)
 async def get_recent_sessions(
-    days: int = 7,
+    request: Request,
+    days: int = Query(7, ge=1, le=365, description="Number of days to look back"),
     pagination: PaginationParams = Depends(get_pagination_params),
+    cursor: KeysetParams = Depends(get_keyset_params),
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Get recent chat sessions for the logged-in user"""
-    try:
-        sessions = await chat_service.get_recent_sessions(
-            db=db,
-            user_id=auth_data.get("user_id"),
+    user_id = ctx.auth_data.get("user_id")
+    plant_id = ctx.plant_context["plant_id"]
+    parts = (pagination.skip, pagination.limit, cursor.after_updated_at, cursor.after_id, days)
+    etag = await session_list_etag(plant_id, user_id, "recent", *parts)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, settings.SESSION_LIST_MAX_AGE)
+    sessions = await cached_session_list(
+        plant_id, user_id, "recent", parts,
+        lambda: chat_service.get_recent_sessions(
+            db=ctx.db,
+            user_id=user_id,
             days=days,
             skip=pagination.skip,
-            limit=pagination.limit
-        )
-        return success_response(
-            data={
-                "sessions": sessions,
-                "total_count": len(sessions),
-                "skip": pagination.skip,
-                "limit": pagination.limit,
-                "days": days
-            },
-            message="Recent sessions retrieved successfully"
+            limit=pagination.limit,
+            after_updated_at=cursor.after_updated_at,
+            after_id=cursor.after_id
         )
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    )
+    return with_cache_headers(success_response(
+        data={
+            "sessions": sessions,
+            "skip": pagination.skip,
+            "limit": pagination.limit,
+            "next_cursor": build_next_cursor(sessions, pagination.limit),
+            "days": days
+        },
+        message="Recent sessions retrieved successfully"
+    ), etag, settings.SESSION_LIST_MAX_AGE)
 
 @router.get("/user/sessions/search", response_model=ResponseModel)
 async def search_sessions(
+    request: Request,
     q: str,
     pagination: PaginationParams = Depends(get_pagination_params),
+    cursor: KeysetParams = Depends(get_keyset_params),
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Search chat sessions for the logged-in user"""
-    try:
-        sessions = await chat_service.search_sessions(
-            db=db,
-            user_id=auth_data.get("user_id"),
+    user_id = ctx.auth_data.get("user_id")
+    plant_id = ctx.plant_context["plant_id"]
+    parts = (pagination.skip, pagination.limit, cursor.after_updated_at, cursor.after_id, q)
+    etag = await session_list_etag(plant_id, user_id, "search", *parts)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, settings.SESSION_LIST_MAX_AGE)
+    sessions = await cached_session_list(
+        plant_id, user_id, "search", parts,
+        lambda: chat_service.search_sessions(
+            db=ctx.db,
+            user_id=user_id,
             search_term=q,
             skip=pagination.skip,
-            limit=pagination.limit
-        )
-        return success_response(
-            data={
-                "sessions": sessions,
-                "total_count": len(sessions),
-                "skip": pagination.skip,
-                "limit": pagination.limit,
-                "search_term": q
-            },
-            message="Search completed successfully"
+            limit=pagination.limit,
+            after_updated_at=cursor.after_updated_at,
+            after_id=cursor.after_id
         )
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
-
-@router.put("/session/{session_id}/star", response_model=ResponseModel)
+    )
+    return with_cache_headers(success_response(
+        data={
+            "sessions": sessions,
+            "skip": pagination.skip,
+            "limit": pagination.limit,
+            "next_cursor": build_next_cursor(sessions, pagination.limit),
+            "search_term": q
+        },
+        message="Search completed successfully"
+    ), etag, settings.SESSION_LIST_MAX_AGE)
+
+@router.put("/session/{session_id}/star", status_code=status.HTTP_204_NO_CONTENT, response_class=Response, response_model=None)
 async def star_unstar_session(
     session_id: str,
     is_starred: bool,
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Star or unstar a chat session"""
-    try:
-        success = await chat_service.update_session_star(
-            db=db,
-            session_id=session_id,
-            is_starred=is_starred,
-            auth_data=auth_data
-        )
-        if success:
-            action = "starred" if is_starred else "unstarred"
-            return success_response(message=f"Session {action} successfully")
-        else:
-            return fail_response(message="Failed to update session star status", status_code=400)
-    except ValueError as e:
-        return fail_response(message=str(e), status_code=404)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    owner_id = await chat_service.update_session_star(
+        db=ctx.db,
+        session_id=session_id,
+        is_starred=is_starred,
+        auth_data=ctx.auth_data
+    )
+    if owner_id is not None:
+        # Admins may edit other users' sessions: the lists to drop are the owner's
+        await invalidate_session_lists(ctx.plant_context["plant_id"], owner_id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    else:
+        return fail_response(message="Session not found or access denied", status_code=404)
 
-@router.put("/session/{session_id}", response_model=ResponseModel)
+@router.put("/session/{session_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response, response_model=None)
 async def update_session(
     session_id: str,
     update_data: ChatSessionUpdateSchema,
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Update a chat session (name, starred status, etc.)"""
-    try:
-        success = True
-        
-        if update_data.chat_name is not None:
-            success = await chat_service.update_session_name(
-                db=db,
-                session_id=session_id,
-                chat_name=update_data.chat_name,
-                auth_data=auth_data
-            )
-        
-        if success and update_data.is_starred is not None:
-            success = await chat_service.update_session_star(
-                db=db,
-                session_id=session_id,
-                is_starred=update_data.is_starred,
-                auth_data=auth_data
-            )
-        
-        if success:
-            return success_response(message="Session updated successfully")
-        else:
-            return fail_response(message="Failed to update session", status_code=400)
-    except ValueError as e:
-        return fail_response(message=str(e), status_code=404)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    if update_data.chat_name is None and update_data.is_starred is None:
+        return fail_response(message="No fields to update", status_code=400)
+    
+    owner_id = await chat_service.update_session_fields(
+        db=ctx.db,
+        session_id=session_id,
+        auth_data=ctx.auth_data,
+        chat_name=update_data.chat_name,
+        is_starred=update_data.is_starred
+    )
+    
+    if owner_id is not None:
+        await invalidate_session_lists(ctx.plant_context["plant_id"], owner_id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    else:
+        return fail_response(message="Session not found or access denied", status_code=404)
 
 @router.delete("/session/{session_id}", response_model=ResponseModel)
 async def delete_session(
     session_id: str,
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Delete a chat session"""
-    try:
-        success = await chat_service.delete_session(
-            db=db,
-            session_id=session_id,
-            auth_data=auth_data
-        )
-        if success:
-            return success_response(message="Session deleted successfully")
-        else:
-            return fail_response(message="Failed to delete session", status_code=400)
-    except ValueError as e:
-        return fail_response(message=str(e), status_code=404)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    owner_id = await chat_service.delete_session(
+        db=ctx.db,
+        session_id=session_id,
+        auth_data=ctx.auth_data
+    )
+    if owner_id is not None:
+        await invalidate_session_lists(ctx.plant_context["plant_id"], owner_id)
+        return success_response(message="Session deleted successfully")
+    else:
+        return fail_response(message="Session not found or access denied", status_code=404)
 
 @router.put("/message/{message_id}", response_model=ResponseModel)
 async def update_message(
     message_id: int,
     update_data: ChatMessageUpdateSchema,
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Update a chat message"""
-    try:
-        updated_message = await chat_service.update_message(
-            db=db,
-            message_id=message_id,
-            message=update_data.message,
-            auth_data=auth_data
-        )
-        if updated_message:
-            return success_response(data=updated_message, message="Message updated successfully")
-        else:
-            return fail_response(message="Message not found or access denied", status_code=404)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    updated_message, owner_id = await chat_service.update_message(
+        db=ctx.db,
+        message_id=message_id,
+        message=update_data.message,
+        auth_data=ctx.auth_data
+    )
+    if updated_message:
+        # The session lists show the last message text
+        await invalidate_session_lists(ctx.plant_context["plant_id"], owner_id)
+        return success_response(data=updated_message, message="Message updated successfully")
+    else:
+        return fail_response(message="Message not found or access denied", status_code=404)
 
 @router.delete("/message/{message_id}", response_model=ResponseModel)
 async def delete_message(
     message_id: int,
     chat_service: ChatService = Depends(get_chat_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Delete a chat message"""
-    try:
-        success = await chat_service.delete_message(
-            db=db,
-            message_id=message_id,
-            auth_data=auth_data
-        )
-        if success:
-            return success_response(message="Message deleted successfully")
-        else:
-            return fail_response(message="Message not found or access denied", status_code=404)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    owner_id = await chat_service.delete_message(
+        db=ctx.db,
+        message_id=message_id,
+        auth_data=ctx.auth_data
+    )
+    if owner_id is not None:
+        await invalidate_session_lists(ctx.plant_context["plant_id"], owner_id)
+        return success_response(message="Message deleted successfully")
+    else:
+        return fail_response(message="Message not found or access denied", status_code=404)
 
 # =============================================================================
 # ADVISOR ENDPOINTS
@@ -624,55 +622,47 @@ async def delete_message(
 async def get_advisor_calc_engine_result(
     request: AdvisorNameIdsRequestSchema,
     advisor_service: AdvisorService = Depends(get_advisor_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Get calculation engine result from name_ids and create session with artifact"""
-    try:
-        result = await advisor_service.get_calc_engine_result_with_session(
-            name_ids=request.name_ids,
-            plant_id=plant_context["plant_id"],
-            user_id=auth_data.get("user_id"),
-            db=db
+    result = await advisor_service.get_calc_engine_result_with_session(
+        name_ids=request.name_ids,
+        plant_id=ctx.plant_context["plant_id"],
+        user_id=ctx.auth_data.get("user_id"),
+        db=ctx.db
+    )
+    
+    if result:
+        await invalidate_session_lists(ctx.plant_context["plant_id"], ctx.auth_data.get("user_id"))
+        return success_response(
+            data=result,
+            message="Calculation engine result retrieved successfully"
         )
-        
-        if result:
-            return success_response(
-                data=result,
-                message="Calculation engine result retrieved successfully"
-            )
-        else:
-            return fail_response(message="Failed to get calculation engine result", status_code=500)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
-
-
-@router.post("/ai/manual-request", response_model=ResponseModel)
+    else:
+        return fail_response(message="Failed to get calculation engine result", status_code=500)
+
+
+@router.post("/ai/manual-request", response_model=ResponseModel, openapi_extra=json_body_openapi(ManualAiRequest))
 async def send_manual_ai_request(
-    request: ManualAiRequestSchema,
+    request: ManualAiRequestSchema = Depends(json_body(ManualAiRequest)),
     advisor_service: AdvisorService = Depends(get_advisor_service),
-    auth_data: Dict[str, Any] = Depends(authenticate_user),
-    plant_context: dict = Depends(validate_plant_access_middleware),
-    db: AsyncSession = Depends(get_plant_db_with_context)
+    ctx: RequestContext = Depends(get_request_context)
 ) -> Any:
     """Send manual AI request with different question types. If session_id provided, update existing artifact."""
-    try:
-        ai_response = await advisor_service.send_manual_ai_request(
-            request, 
-            db=db,
-            user_id=auth_data.get("user_id"),
-            auth_data=auth_data,
-            plant_id=plant_context["plant_id"]
+    ai_response = await advisor_service.send_manual_ai_request(
+        request, 
+        db=ctx.db,
+        user_id=ctx.auth_data.get("user_id"),
+        auth_data=ctx.auth_data,
+        plant_id=ctx.plant_context["plant_id"]
+    )
+    
+    if ai_response:
+        await invalidate_session_lists(ctx.plant_context["plant_id"], ctx.auth_data.get("user_id"))
+        return success_response(
+            data=ai_response,
+            message="Manual AI request sent successfully"
         )
-        
-        if ai_response:
-            return success_response(
-                data=ai_response,
-                message="Manual AI request sent successfully"
-            )
-        else:
-            return fail_response(message="Failed to get response from AI", status_code=500)
-    except Exception as e:
-        return fail_response(message=str(e), status_code=500)
+    else:
+        return fail_response(message="Failed to get response from AI", status_code=500)
 
@@ -6,6 +6,7 @@ from services.query_service import QueryService
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_plant_db_with_context, get_plant_context
 from middlewares.plant_access_middleware import validate_plant_access_middleware
+from utils.response import APIResponse
 
 query_router = APIRouter(prefix="/query", tags=["query"])
 
@@ -28,9 +29,11 @@ class QueryExecuteResponse(BaseModel):
     row_count: int
     execution_time_ms: float
 
-# Dependency
+# Dependency - QueryService keeps no per-request state, so one instance is shared
+_query_service = QueryService()
+
 async def get_query_service():
-    return QueryService()
+    return _query_service
 
 @query_router.post("/transform", response_model=QueryTransformResponse)
 async def transform_query(
@@ -46,10 +49,12 @@ async def transform_query(
             request.original_column_names
         )
         
-        return QueryTransformResponse(
-            original_query=request.query,
-            transformed_query=transformed_query
-        )
+        # Returned as a Response so FastAPI skips dumping, re-validating and re-encoding against
+        # response_model (kept for the OpenAPI schema); results rows go straight to orjson
+        return APIResponse(content={
+            "original_query": request.query,
+            "transformed_query": transformed_query
+        })
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error transforming query: {str(e)}")
 
@@ -76,12 +81,12 @@ async def execute_query(
             plant_id=plant_context.get("plant_id")
         )
         
-        return QueryExecuteResponse(
-            query=transformed_query,
-            results=results,
-            row_count=row_count,
-            execution_time_ms=execution_time
-        )
+        return APIResponse(content={
+            "query": transformed_query,
+            "results": results,
+            "row_count": row_count,
+            "execution_time_ms": execution_time
+        })
     except PermissionError as e:
         raise HTTPException(status_code=403, detail=str(e))
     except Exception as e:
@@ -97,6 +102,6 @@ async def analyze_query(
     """
     try:
         analysis = query_service.analyze_query(request.query)
-        return analysis
+        return APIResponse(content=analysis)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error analyzing query: {str(e)}")
\ No newline at end of file
@@ -1,9 +1,14 @@
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Discriminator, Field, StringConstraints, Tag, model_validator
 from enum import Enum
-from typing import List, TypeVar, Optional, Generic, Dict, Any, Literal, Union
+from typing import Annotated, List, TypeVar, Optional, Generic, Dict, Any, Literal, Union
+from utils.pagination import MAX_SKIP, MAX_LIMIT
 
 T = TypeVar('T')
 
+def _literal_of(enum_cls: type) -> Any:
+    """Literal type of the values of a str Enum"""
+    return Literal[tuple(member.value for member in enum_cls)]
+
 class ResponseModel(BaseModel, Generic[T]):
     """Generic response model for API responses"""
     status: str = Field(..., description="Status of the response, could be 'success' or 'fail'")
@@ -36,6 +41,11 @@ class PlotType(str, Enum):
     PIE = "pie_plot"
 
 
+# Fields are typed with Literal values rather than the Enums: pydantic-core checks them with a
+# plain string comparison and the validated value is the str itself. The Enums stay as named constants.
+AnswerTypeValue = _literal_of(AnswerType)
+PlotTypeValue = _literal_of(PlotType)
+
 class AiDataResponseSchema(BaseModel):
     name: str = Field(..., description="Name of the data")
     data: List[dict] = Field(..., description="Data points")
@@ -56,19 +66,27 @@ class GroupingFunction(str, Enum):
     FIRST = "FIRST"
     LAST = "LAST"
 
+QuestionTypeValue = _literal_of(QuestionType)
+GroupingFunctionValue = _literal_of(GroupingFunction)
+
 class EntitySchema(BaseModel):
     """Schema for retrieving an entity within the knowledgeGraph"""
+    model_config = ConfigDict(strict=True)
+    
     labels: List[str] = Field(..., min_length=1, description="The labels of the entity, Not nullable, Not empty")
     name_id: str = Field(..., min_length=1, description="The name_id of the entity, Not nullable, Not empty")
 
 class TsQuerySchema(BaseModel):
     """Schema for time series queries"""
+    # Request-only: values arrive typed from the JSON body, so no coercion is attempted
+    model_config = ConfigDict(strict=True)
+    
     start_date: str
     end_date: str
     name_ids: List[str]
     time_bucket: Optional[str] = None
-    grouping_function: Optional[GroupingFunction] = None
-    plot_type: Optional[PlotType] = None
+    grouping_function: Optional[GroupingFunctionValue] = None
+    plot_type: Optional[PlotTypeValue] = None
 
     @model_validator(mode="before")
     @classmethod
@@ -87,20 +105,25 @@ class TsQuerySchema(BaseModel):
 # be aware that the ai responses with List of this schema.
 class AiResponseSchema(BaseModel):
     answer: str = Field(..., description="Answer provided by the AI")
-    data: Optional[List[Union[str, Dict]]] = Field(None, description="Additional data related to the answer")
-    answer_type: AnswerType = Field(..., description="Type of the answer")
-    plot_type: Optional[PlotType] = Field(None, description="Type of plot if applicable")
-    question_type: Optional[QuestionType] = Field(None, description="The type of question: advice, view, or explore")
+    # Opaque AI payload passed through as-is: List[Any] skips the per-element str/dict union check
+    data: Optional[List[Any]] = Field(None, description="Additional data related to the answer")
+    answer_type: AnswerTypeValue = Field(..., description="Type of the answer")
+    plot_type: Optional[PlotTypeValue] = Field(None, description="Type of plot if applicable")
+    question_type: Optional[QuestionTypeValue] = Field(None, description="The type of question: advice, view, or explore")
     rewritten_question: str = Field(..., description="The rewritten question by the AI")
     advice_data: Optional['AdvisorCompleteRequestSchema'] = Field(None, description="Advice data when question_type is advice")
 
 class DataPoint(BaseModel):
     """Individual data point with timestamp and value"""
+    model_config = ConfigDict(frozen=True)
+    
     timestamp: str
     value: float
 
 class TagData(BaseModel):
     """Group of data points for a specific tag"""
+    model_config = ConfigDict(frozen=True)
+    
     tag_id: str
     data: List[DataPoint]
 
@@ -140,17 +163,21 @@ class ArtifactType(str, Enum):
     DOCUMENT = "document"
     GENERAL = "general"
 
+ArtifactTypeValue = _literal_of(ArtifactType)
+
 class ArtifactCreateSchema(BaseModel):
     """Schema for creating a new artifact"""
     session_id: str = Field(..., description="Session ID this artifact belongs to")
     title: str = Field(..., description="Title of the artifact")
-    artifact_type: ArtifactType = Field(default=ArtifactType.GENERAL, description="Type of artifact")
+    artifact_type: ArtifactTypeValue = Field(default=ArtifactType.GENERAL.value, description="Type of artifact")
     content: str = Field(..., description="Content of the artifact")
     artifact_metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
     message_id: Optional[int] = Field(None, description="ID of the message that generated this artifact")
 
 class ArtifactResponseSchema(BaseModel):
     """Schema for artifact response"""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
     id: int
     session_id: str
     user_id: int
@@ -173,6 +200,8 @@ class ArtifactUpdateSchema(BaseModel):
 
 class ArtifactListResponseSchema(BaseModel):
     """Schema for listing artifacts"""
+    model_config = ConfigDict(from_attributes=True)
+    
     artifacts: List[ArtifactResponseSchema]
     total_count: int
     session_id: str
@@ -183,6 +212,8 @@ class ArtifactListResponseSchema(BaseModel):
 
 class ChatSessionResponseSchema(BaseModel):
     """Schema for chat session response"""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
     id: int
     session_id: str
     user_id: int
@@ -197,6 +228,8 @@ class ChatSessionResponseSchema(BaseModel):
 
 class ChatSessionListResponseSchema(BaseModel):
     """Schema for listing chat sessions"""
+    model_config = ConfigDict(from_attributes=True)
+    
     sessions: List[ChatSessionResponseSchema]
     total_count: int
     skip: int
@@ -214,24 +247,29 @@ class ChatMessageUpdateSchema(BaseModel):
 class ChatSearchRequestSchema(BaseModel):
     """Schema for chat search request"""
     search_term: str = Field(..., description="Search term for chat names")
-    skip: int = Field(0, description="Number of results to skip")
-    limit: int = Field(100, description="Maximum number of results to return")
+    skip: int = Field(0, ge=0, le=MAX_SKIP, description="Number of results to skip")
+    limit: int = Field(100, ge=1, le=MAX_LIMIT, description="Maximum number of results to return")
 
 class RecentChatsRequestSchema(BaseModel):
     """Schema for recent chats request"""
-    days: int = Field(7, description="Number of days to look back")
-    skip: int = Field(0, description="Number of results to skip")
-    limit: int = Field(100, description="Maximum number of results to return")
+    days: int = Field(7, ge=1, le=365, description="Number of days to look back")
+    skip: int = Field(0, ge=0, le=MAX_SKIP, description="Number of results to skip")
+    limit: int = Field(100, ge=1, le=MAX_LIMIT, description="Maximum number of results to return")
 
 # =============================================================================
 # ADVISOR SERVICE SCHEMAS
 # =============================================================================
 
+# Surrounding whitespace is stripped, so a blank value fails min_length
+NonBlankStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+
 class AdvisorRequestSchema(BaseModel):
     """Schema for advisor service request"""
-    tag_id: str = Field(..., description="ID of the tag to analyze")
+    model_config = ConfigDict(strict=True)
+    
+    tag_id: NonBlankStr = Field(..., description="ID of the tag to analyze")
     target_value: float = Field(..., description="Target value for the tag")
-    unit_of_measure: str = Field(..., description="Unit of measure for the target value")
+    unit_of_measure: NonBlankStr = Field(..., description="Unit of measure for the target value")
 
 class TagListSchema(BaseModel):
     """Schema for a list of tags"""
@@ -263,6 +301,22 @@ class RecommendationLimitEntitySchema(RecommendationEntitySchema):
     priority: Optional[str]=None
     parameter_source: Optional[str] = Field(None, alias="source")
 
+def _filter_named_limits(limits: Any) -> Any:
+    """
+    Drop limit objects without a name_id; an empty result becomes None.
+    Anything else (not a list, null or non-object entries, model instances) is left for pydantic to validate,
+    so malformed input is rejected with a 422 instead of failing here.
+    """
+    if not limits:
+        return None
+    if not isinstance(limits, list):
+        return limits
+    filtered = [limit for limit in limits if not isinstance(limit, dict) or limit.get("name_id") is not None]
+    return filtered or None
+
+# Shared by low_limits and high_limits, so the filter is a single function attached to one type
+NamedLimits = Annotated[Optional[List[RecommendationLimitEntitySchema]], BeforeValidator(_filter_named_limits)]
+
 class TargetUpdateSchema(BaseModel):
     """Schema for target updates with new values"""
     name_id: str
@@ -272,43 +326,14 @@ class TargetUpdateSchema(BaseModel):
 class RecommendationElementSchema(RecommendationEntitySchema):
     slack_weight: Optional[RecommendationEntitySchema] =None
     mv_weight: Optional[RecommendationEntitySchema]=None
-    low_limits: Optional[List[RecommendationLimitEntitySchema]]=None
-    high_limits: Optional[List[RecommendationLimitEntitySchema]]=None
+    low_limits: NamedLimits = None
+    high_limits: NamedLimits = None
     variable_type: Optional[str] = None
     unitary_price: Optional[RecommendationEntitySchema] = None
     target_value: Optional[float] = None
     timestamp: Optional[str] = None
     simulated_value: Optional[float] = None
 
-    @field_validator("low_limits",mode="before")
-    @staticmethod
-    def validate_low_limits(low_limits:Optional[List[Dict]]=None)->Optional[List[RecommendationLimitEntitySchema]]:
-        if low_limits is None:
-            return None
-        if isinstance(low_limits, list) and isinstance(low_limits[0], RecommendationLimitEntitySchema):
-            return low_limits
-        new_low_limits = []
-        for limit in low_limits:
-            if limit["name_id"] is not None:
-                new_low_limits.append(limit)
-        if new_low_limits == []:
-            return None
-        return new_low_limits
-    @field_validator("high_limits",mode="before")
-    @staticmethod
-    def validate_high_limits(high_limits:Optional[List[Dict]]=None)->Optional[List[RecommendationLimitEntitySchema]]:
-        if high_limits is None:
-            return None
-        if isinstance(high_limits, list) and isinstance(high_limits[0], RecommendationLimitEntitySchema):
-            return high_limits
-        new_high_limits = []
-        for limit in high_limits:
-            if limit["name_id"] is not None:
-                new_high_limits.append(limit)
-        if new_high_limits == []:
-            return None
-        return new_high_limits
-
 class RecommendationCalculationEnginePairSchema(BaseModel):
     "schema of each Pair element, out from the neo4j query"
     "from is folloowed by _ because it's a reserved word"
@@ -359,46 +384,65 @@ class AdvisorSimpleRequestSchema(BaseModel):
     targets: List[TargetUpdateSchema] = Field(..., description="Targets with new values to update")
 
 
+def _advice_data_kind(data: Any) -> Optional[str]:
+    """Tag of the advice data variant: the simple format unless full calculation engine pairs are sent"""
+    if isinstance(data, BaseModel):
+        return _ADVICE_DATA_TAGS.get(type(data))
+    if isinstance(data, dict):
+        if "modified_limits" in data and "targets" in data and "pairs" not in data:
+            return "advisor_simple"
+        return "calc_engine"
+    return None
+
+_ADVICE_DATA_TAGS = {
+    RecommendationCalculationEngineSchema: "calc_engine",
+    AdvisorSimpleRequestSchema: "advisor_simple",
+}
+
+AdviceRequestData = Annotated[
+    Union[
+        Annotated[RecommendationCalculationEngineSchema, Tag("calc_engine")],
+        Annotated[AdvisorSimpleRequestSchema, Tag("advisor_simple")],
+    ],
+    Discriminator(_advice_data_kind),
+]
+
 class ManualAiRequestSchema(BaseModel):
-    """Schema for manual AI requests with different question types"""
+    """Fields shared by the manual AI requests of every question type"""
     model_config = {"populate_by_name": True, "use_enum_values": False}
     
-    data: Optional[Union[List[EntitySchema], TsQuerySchema, RecommendationCalculationEngineSchema, AdvisorSimpleRequestSchema]] = None
-    label: QuestionType = Field(..., alias="question_type", description="Type of question to ask AI")
+    label: QuestionTypeValue = Field(..., alias="question_type", description="Type of question to ask AI")
     session_id: Optional[str] = Field(None, description="Optional session ID to use existing session and update its artifact")
-    # modified_limits: Optional[Dict[str, float]] = Field(None, description="Modified limits to update in pairs (for simple format)")
-    # targets: Optional[List[TargetUpdateSchema]] = Field(None, description="Targets with new values (for simple format)")
+
+class ExploreAiRequestSchema(ManualAiRequestSchema):
+    """Manual AI request exploring knowledge graph entities"""
+    label: Literal["explore"] = Field(..., alias="question_type", description="Type of question to ask AI")
+    data: Optional[List[EntitySchema]] = None
+
+class ViewAiRequestSchema(ManualAiRequestSchema):
+    """Manual AI request viewing a time-series query"""
+    label: Literal["view"] = Field(..., alias="question_type", description="Type of question to ask AI")
+    data: Optional[TsQuerySchema] = None
+
+class AdviceAiRequestSchema(ManualAiRequestSchema):
+    """Manual AI request asking for advice on calculation engine results"""
+    label: Literal["advice"] = Field(..., alias="question_type", description="Type of question to ask AI")
+    data: Optional[AdviceRequestData] = None
     
     @model_validator(mode="before")
     @classmethod
-    def validate_data_based_on_question_type(cls, values):
-        if isinstance(values, dict):
-            question_type = values.get("question_type")
-            data = values.get("data")
+    def move_root_advice_fields_into_data(cls, values):
+        """Accept the simple advice format, with modified_limits and targets at root level instead of in data"""
+        if isinstance(values, dict) and not values.get("data"):
             modified_limits = values.get("modified_limits")
             targets = values.get("targets")
-            
-            # Check if it's the simple format (modified_limits + targets at root level)
-            if question_type == QuestionType.ADVICE and modified_limits and targets and not data:
-                # Build AdvisorSimpleRequestSchema from root level fields
-                values["data"] = AdvisorSimpleRequestSchema(
-                    modified_limits=modified_limits,
-                    targets=targets
-                )
-            elif data:
-                # Original format with data field
-                if question_type == QuestionType.VIEW:
-                    if isinstance(data, dict):
-                        values["data"] = TsQuerySchema(**data)
-                elif question_type == QuestionType.EXPLORE:
-                    if isinstance(data, list):
-                        values["data"] = [EntitySchema(**item) for item in data]
-                elif question_type == QuestionType.ADVICE:
-                    if isinstance(data, dict):
-                        # Check if it's the simple format or full schema
-                        if "modified_limits" in data and "targets" in data and "pairs" not in data:
-                            values["data"] = AdvisorSimpleRequestSchema(**data)
-                        else:
-                            values["data"] = RecommendationCalculationEngineSchema(**data)
-        
+            if modified_limits and targets:
+                values = {**values, "data": {"modified_limits": modified_limits, "targets": targets}}
         return values
+
+# Discriminated union on question_type: pydantic-core validates only the request model of that
+# question type, so the data payload is always checked against the variant the client asked for
+ManualAiRequest = Annotated[
+    Union[ExploreAiRequestSchema, ViewAiRequestSchema, AdviceAiRequestSchema],
+    Field(discriminator="label"),
+]
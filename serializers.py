@@ -1,5 +1,7 @@
-import json
-from typing import List, Dict, Any
+import orjson
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from core.config import settings
 from utils.log import setup_logger
 from datetime import datetime
 
@@ -47,7 +49,96 @@ def format_api_response(session_id: str, message: str, raw_data: Any) -> Dict[st
         "timestamp": datetime.now().isoformat()
     }
 
-def format_history_response(chat_message) -> Dict[str, Any]:
+def _build_history_response(msg_id: int, created_at: Any, response_text: Optional[str], session_id: str, message: str, query: Optional[str]) -> Dict[str, Any]:
+    """Build the history response for one stored message from its stored fields (timestamp left unformatted)"""
+    # Parse response if it exists
+    response_data = []
+    if response_text:
+        try:
+            parsed_response = orjson.loads(response_text)
+            
+            # Check if response is already in expected structured formats
+            if isinstance(parsed_response, list) and len(parsed_response) > 0 and isinstance(parsed_response[0], dict):
+                if "tag_id" in parsed_response[0] and "data" in parsed_response[0]:
+                    # Time-series grouped by tag format: keep as-is
+                    response_data = parsed_response
+                elif "answer" in parsed_response[0]:
+                    # AI chat response objects (AiResponseSchema-like): keep as-is
+                    response_data = parsed_response
+                else:
+                    # Convert old format (flat) to new format (grouped by tag) in one pass,
+                    # merging in any already grouped entries of mixed legacy responses
+                    tag_groups = {}
+                    
+                    for item in parsed_response:
+                        if not isinstance(item, dict) or "tag_id" not in item:
+                            continue
+                            
+                        # Extract fields
+                        if isinstance(item.get("data"), list):
+                            tag_groups.setdefault(item["tag_id"], []).extend(item["data"])
+                        elif "timestamp" in item and "value" in item:
+                            tag_groups.setdefault(item["tag_id"], []).append({
+                                "timestamp": item["timestamp"],
+                                "value": float(item["value"])
+                            })
+                    
+                    # Format response
+                    response_data = [
+                        {
+                            "tag_id": tag_id,
+                            "data": data_points
+                        }
+                        for tag_id, data_points in tag_groups.items()
+                    ]
+            elif isinstance(parsed_response, dict):
+                # Single AI response object: wrap in array
+                response_data = [parsed_response]
+            else:
+                # Other formats: keep as-is
+                response_data = parsed_response
+        except orjson.JSONDecodeError:
+            logger.error(f"Error decoding JSON for message {msg_id}")
+            response_data = []
+        except Exception as e:
+            logger.error(f"Error formatting history response: {e}")
+            response_data = []
+    
+    # Create full response
+    response = {
+        "session_id": session_id,
+        "message": message,
+        "response": response_data,
+        "timestamp": created_at
+    }
+    
+    # If there's an error stored in the query field (our workaround)
+    if query and query.startswith("Error:"):
+        response["error"] = {
+            "type": "service_error",
+            "message": query[7:].strip()  # Remove "Error: " prefix
+        }
+        
+    return response
+
+# Formatted history messages, least recently used first, bounded by the total size of the cached bytes
+# (a few large AI responses must not pin unbounded memory per worker). Keyed on (id, updated_at):
+# editing a message bumps updated_at, so the edited version simply misses.
+_history_cache: "OrderedDict[Tuple[int, Any], bytes]" = OrderedDict()
+_history_cache_bytes = 0
+
+def _cache_history(key: Tuple[int, Any], formatted: bytes):
+    """Store formatted under key, evicting the least recently used entries beyond HISTORY_FORMAT_CACHE_MAX_BYTES"""
+    global _history_cache_bytes
+    if len(formatted) > settings.HISTORY_FORMAT_CACHE_MAX_BYTES:
+        return
+    _history_cache[key] = formatted
+    _history_cache_bytes += len(formatted)
+    while _history_cache_bytes > settings.HISTORY_FORMAT_CACHE_MAX_BYTES:
+        _, evicted = _history_cache.popitem(last=False)
+        _history_cache_bytes -= len(evicted)
+
+def format_history_response(chat_message) -> bytes:
     """
     Format a history message into the API response structure
     
@@ -55,86 +146,32 @@ def format_history_response(chat_message) -> Dict[str, Any]:
         chat_message: ChatMessage object from database
         
     Returns:
-        Formatted API response
+        Formatted API response, serialized to JSON bytes
     """
     try:
-        # Parse response if it exists
-        response_data = []
-        if chat_message.response:
-            try:
-                parsed_response = json.loads(chat_message.response)
-                
-                # Check if response is already in expected structured formats
-                if isinstance(parsed_response, list) and len(parsed_response) > 0 and isinstance(parsed_response[0], dict):
-                    if "tag_id" in parsed_response[0] and "data" in parsed_response[0]:
-                        # Time-series grouped by tag format: keep as-is
-                        response_data = parsed_response
-                    elif "answer" in parsed_response[0]:
-                        # AI chat response objects (AiResponseSchema-like): keep as-is
-                        response_data = parsed_response
-                    else:
-                        # Convert old format (flat) to new format (grouped by tag)
-                        tag_groups = {}
-                        
-                        for item in parsed_response:
-                            if not isinstance(item, dict):
-                                continue
-                                
-                            # Extract fields
-                            if "tag_id" in item and "timestamp" in item and "value" in item:
-                                tag_id = item["tag_id"]
-                                
-                                if tag_id not in tag_groups:
-                                    tag_groups[tag_id] = []
-                                    
-                                tag_groups[tag_id].append({
-                                    "timestamp": item["timestamp"],
-                                    "value": float(item["value"])
-                                })
-                        
-                        # Format response
-                        response_data = [
-                            {
-                                "tag_id": tag_id,
-                                "data": data_points
-                            }
-                            for tag_id, data_points in tag_groups.items()
-                        ]
-                elif isinstance(parsed_response, dict):
-                    # Single AI response object: wrap in array
-                    response_data = [parsed_response]
-                else:
-                    # Other formats: keep as-is
-                    response_data = parsed_response
-            except json.JSONDecodeError:
-                logger.error(f"Error decoding JSON for message {chat_message.id}")
-                response_data = []
-            except Exception as e:
-                logger.error(f"Error formatting history response: {e}")
-                response_data = []
-        
-        # Create full response
-        response = {
-            "session_id": chat_message.session_id,
-            "message": chat_message.message,
-            "response": response_data,
-            "timestamp": chat_message.created_at.isoformat() if hasattr(chat_message.created_at, 'isoformat') else str(chat_message.created_at)
-        }
-        
-        # If there's an error stored in the query field (our workaround)
-        if chat_message.query and chat_message.query.startswith("Error:"):
-            response["error"] = {
-                "type": "service_error",
-                "message": chat_message.query[7:].strip()  # Remove "Error: " prefix
-            }
-            
-        return response
+        key = (chat_message.id, chat_message.updated_at)
+        formatted = _history_cache.get(key)
+        if formatted is not None:
+            _history_cache.move_to_end(key)
+            return formatted
+        # orjson writes created_at in the same format as isoformat(), without a Python-level call
+        formatted = orjson.dumps(_build_history_response(
+            chat_message.id,
+            chat_message.created_at,
+            chat_message.response,
+            chat_message.session_id,
+            chat_message.message,
+            chat_message.query
+        ), default=str)
+        _cache_history(key, formatted)
+        return formatted
     except Exception as e:
         logger.error(f"Error in format_history_response: {e}")
         # Return a minimal valid response on error
-        return {
+        response = {
             "session_id": chat_message.session_id if hasattr(chat_message, "session_id") else "",
             "message": chat_message.message if hasattr(chat_message, "message") else "",
             "response": [],
             "timestamp": chat_message.created_at.isoformat() if hasattr(chat_message, "created_at") and hasattr(chat_message.created_at, "isoformat") else ""
-        }
\ No newline at end of file
+        }
+        return orjson.dumps(response, default=str)
@@ -1,31 +1,33 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils.log import setup_logger
 from queries.advisor_queries import get_advisor_data, get_related_tags
-from queries.chat_session_queries import create_chat_session, get_chat_session, update_chat_session
+from queries.chat_session_queries import create_chat_session, get_chat_session_with_latest_artifact, update_chat_session
 from queries.chat_message_queries import create_chat_message
 from schemas.schema import (
     AdvisorRequestSchema, AdvisorResponseSchema, AdvisorNameIdsRequestSchema,
     AdvisorCalcEngineResultSchema, AdvisorCalcRequestWithTargetsSchema,
     AdvisorCompleteRequestSchema, ManualAiRequestSchema, QuestionType, AiResponseSchema,
     AdvisorSimpleRequestSchema, RecommendationCalculationEngineSchema,
-    ArtifactCreateSchema, ArtifactType
+    ArtifactCreateSchema, ArtifactType, EntitySchema
 )
-from services.calculation_engine_services import build_execute_recommendation_query, finish_calc_engine_request, update_pairs, build_recommendation_schema
+from services.calculation_engine_services import build_execute_recommendation_query, finish_calc_engine_request, update_pairs, get_recommendation_schema
 from services.artifact_service import ArtifactService
 from typing import Dict, Any, Optional, List, Tuple
-import json
+from pydantic import TypeAdapter
+import asyncio
+import time
 import httpx
-from dotenv import load_dotenv
-import os
+import orjson
+from utils.http_client import get_http_client
+from core.config import settings
 import uuid
 from datetime import datetime
 
-load_dotenv('./../.env', override=True)
-
-AI_AGENT_URL = "http://38.128.233.128:8000/ai-agent/manual"
-
 logger = setup_logger(__name__)
 
+# Built once: constructing a TypeAdapter compiles a new core schema each time
+_ENTITIES_ADAPTER = TypeAdapter(List[EntitySchema])
+
 class AdvisorService:
     """Service for handling advisor-related operations"""
     
@@ -48,48 +50,43 @@ class AdvisorService:
         Returns:
             AdvisorResponseSchema with variables containing lists of tags
         """
-        try:
-            self.logger.info(f'Processing advisor request for tag: {request_data.tag_id}')
-            
-            # Get tag data from database
-            tag_data = await get_advisor_data(
-                db, 
-                request_data.tag_id, 
-                request_data.target_value, 
-                request_data.unit_of_measure
-            )
-            
-            if not tag_data:
-                self.logger.error(f'No data found for tag: {request_data.tag_id}')
-                return None
-            
-            # Get related tags for context
-            related_tags = await get_related_tags(db, tag_data.get("plant_id"), request_data.tag_id)
-            
-            # Prepare data for external function call
-            external_function_data = {
-                "tag_info": tag_data,
-                "related_tags": related_tags or [],
-                "target_value": request_data.target_value,
-                "unit_of_measure": request_data.unit_of_measure
-            }
-            
-            # Call external function (placeholder - you will implement this later)
-            external_response = await self._call_external_advisor_function(external_function_data)
-            
-            if not external_response:
-                self.logger.error('External advisor function returned no response')
-                return None
-            
-            # Parse the external response into the expected format
-            advisor_response = self._parse_external_response(external_response)
-            
-            self.logger.success(f'Successfully processed advisor request for tag: {request_data.tag_id}')
-            return advisor_response
-            
-        except Exception as e:
-            self.logger.error(f'Error processing advisor request: {e}')
-            raise e
+        self.logger.info(f'Processing advisor request for tag: {request_data.tag_id}')
+        
+        # Get tag data from database
+        tag_data = await get_advisor_data(
+            db, 
+            request_data.tag_id, 
+            request_data.target_value, 
+            request_data.unit_of_measure
+        )
+        
+        if not tag_data:
+            self.logger.error(f'No data found for tag: {request_data.tag_id}')
+            return None
+        
+        # Get related tags for context
+        related_tags = await get_related_tags(db, tag_data.get("plant_id"), request_data.tag_id)
+        
+        # Prepare data for external function call
+        external_function_data = {
+            "tag_info": tag_data,
+            "related_tags": related_tags or [],
+            "target_value": request_data.target_value,
+            "unit_of_measure": request_data.unit_of_measure
+        }
+        
+        # Call external function (placeholder - you will implement this later)
+        external_response = await self._call_external_advisor_function(external_function_data)
+        
+        if not external_response:
+            self.logger.error('External advisor function returned no response')
+            return None
+        
+        # Parse the external response into the expected format
+        advisor_response = self._parse_external_response(external_response)
+        
+        self.logger.success(f'Successfully processed advisor request for tag: {request_data.tag_id}')
+        return advisor_response
     
     async def _call_external_advisor_function(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -102,25 +99,20 @@ class AdvisorService:
         Returns:
             Response from external function
         """
-        try:
-            self.logger.info('Calling external advisor function (placeholder)')
-            
-            # TODO: Implement actual external function call here
-            # For now, return a mock response structure
-            mock_response = {
-                "variable1": ["tag_001", "tag_002", "tag_003"],
-                "variable2": ["tag_004", "tag_005"],
-                "variable3": ["tag_006", "tag_007", "tag_008", "tag_009"],
-                "recommendations": ["tag_010", "tag_011"],
-                "warnings": ["tag_012"]
-            }
-            
-            self.logger.info('External advisor function returned mock response')
-            return mock_response
-            
-        except Exception as e:
-            self.logger.error(f'Error calling external advisor function: {e}')
-            raise e
+        self.logger.info('Calling external advisor function (placeholder)')
+        
+        # TODO: Implement actual external function call here
+        # For now, return a mock response structure
+        mock_response = {
+            "variable1": ["tag_001", "tag_002", "tag_003"],
+            "variable2": ["tag_004", "tag_005"],
+            "variable3": ["tag_006", "tag_007", "tag_008", "tag_009"],
+            "recommendations": ["tag_010", "tag_011"],
+            "warnings": ["tag_012"]
+        }
+        
+        self.logger.info('External advisor function returned mock response')
+        return mock_response
     
     def _parse_external_response(self, external_response: Dict[str, Any]) -> AdvisorResponseSchema:
         """
@@ -132,60 +124,23 @@ class AdvisorService:
         Returns:
             Parsed AdvisorResponseSchema
         """
-        try:
-            self.logger.info('Parsing external advisor response')
-            
-            # Ensure all values in the response are lists of strings (tag IDs)
-            variables = {}
-            for key, value in external_response.items():
-                if isinstance(value, list):
-                    # Ensure all items in the list are strings
-                    variables[key] = [str(item) for item in value]
-                else:
-                    # Convert single values to list
-                    variables[key] = [str(value)]
-            
-            response = AdvisorResponseSchema(variables=variables)
-            
-            self.logger.success(f'Parsed response with {len(variables)} variables')
-            return response
-            
-        except Exception as e:
-            self.logger.error(f'Error parsing external response: {e}')
-            raise e
-    
-    async def validate_request(self, request_data: AdvisorRequestSchema) -> bool:
-        """
-        Validate advisor request data.
+        self.logger.info('Parsing external advisor response')
         
-        Args:
-            request_data: Request data to validate
+        # Ensure all values in the response are lists of strings (tag IDs)
+        variables = {}
+        for key, value in external_response.items():
+            if isinstance(value, list):
+                # Tag lists usually already hold strings: keep them instead of copying item by item
+                variables[key] = value if all(type(item) is str for item in value) else [str(item) for item in value]
+            else:
+                # Convert single values to list
+                variables[key] = [str(value)]
         
-        Returns:
-            True if valid, False otherwise
-        """
-        try:
-            # Check if tag_id is provided and not empty
-            if not request_data.tag_id or not request_data.tag_id.strip():
-                self.logger.error('Tag ID is required and cannot be empty')
-                return False
-            
-            # Check if target_value is a valid number
-            if not isinstance(request_data.target_value, (int, float)):
-                self.logger.error('Target value must be a number')
-                return False
-            
-            # Check if unit_of_measure is provided and not empty
-            if not request_data.unit_of_measure or not request_data.unit_of_measure.strip():
-                self.logger.error('Unit of measure is required and cannot be empty')
-                return False
-            
-            self.logger.info('Advisor request validation passed')
-            return True
-            
-        except Exception as e:
-            self.logger.error(f'Error validating request: {e}')
-            return False
+        # variables is Dict[str, List[str]] by construction, so skip re-validating every tag
+        response = AdvisorResponseSchema.model_construct(variables=variables)
+        
+        self.logger.success(f'Parsed response with {len(variables)} variables')
+        return response
     
     async def get_calc_engine_result(
         self, 
@@ -202,31 +157,26 @@ class AdvisorService:
         Returns:
             AdvisorCalcEngineResultSchema with dependent and independent variables
         """
-        try:
-            self.logger.info(f'Getting calc engine result for name_ids: {name_ids}')
-            
-            # Validate plant_id parameter
-            if not plant_id:
-                self.logger.error("Plant ID is required")
-                return None
-            
-            # Call the calculation engine service
-            targets, dependent_variables, independent_variables = await build_execute_recommendation_query(
-                name_ids, plant_id
-            )
-            
-            result = AdvisorCalcEngineResultSchema(
-                dependent_variables=dependent_variables,
-                independent_variables=independent_variables,
-                targets=targets
-            )
-            
-            self.logger.success(f'Successfully got calc engine result for {len(name_ids)} name_ids')
-            return result
-            
-        except Exception as e:
-            self.logger.error(f'Error getting calc engine result: {e}')
-            raise e
+        self.logger.info(f'Getting calc engine result for name_ids: {name_ids}')
+        
+        # Validate plant_id parameter
+        if not plant_id:
+            self.logger.error("Plant ID is required")
+            return None
+        
+        # Call the calculation engine service
+        targets, dependent_variables, independent_variables = await build_execute_recommendation_query(
+            name_ids, plant_id
+        )
+        
+        result = AdvisorCalcEngineResultSchema(
+            dependent_variables=dependent_variables,
+            independent_variables=independent_variables,
+            targets=targets
+        )
+        
+        self.logger.success(f'Successfully got calc engine result for {len(name_ids)} name_ids')
+        return result
     
     async def get_calc_engine_result_with_session(
         self, 
@@ -247,79 +197,70 @@ class AdvisorService:
         Returns:
             Dict with session_id, artifact_id, and calc engine result data
         """
-        try:
-            self.logger.info(f'Getting calc engine result with session for name_ids: {name_ids}')
-            
-            # Get calculation engine result
-            result = await self.get_calc_engine_result(name_ids, plant_id)
-            
-            if not result:
-                return None
-            
-            # Create new chat session
-            session_id = str(uuid.uuid4())
-            created_session = await create_chat_session(db, session_id, user_id)
-            if not created_session:
-                self.logger.error('Failed to create session')
-                return None
-            
-            self.logger.success(f'Session created: {session_id}')
-            
-            # Prepare artifact content with calc engine result
-            artifact_content = json.dumps({
-                "dependent_variables": [var.dict() for var in result.dependent_variables],
-                "independent_variables": [var.dict() for var in result.independent_variables],
-                "targets": [target.dict() for target in result.targets]
-            }, indent=2)
-            
-            # Create artifact with calculation engine data
-            artifact = await self.artifact_service.create_artifact(
-                db=db,
-                artifact_data=ArtifactCreateSchema(
-                    session_id=session_id,
-                    title="Calculation Engine Result",
-                    artifact_type=ArtifactType.ADVICE,
-                    content=artifact_content,
-                    artifact_metadata={
-                        "source": "calc_engine",
-                        "name_ids": name_ids,
-                        "plant_id": plant_id,
-                        "stage": "initial",
-                        "calc_engine_data": {
-                            "dependent_variables": [var.dict() for var in result.dependent_variables],
-                            "independent_variables": [var.dict() for var in result.independent_variables],
-                            "targets": [target.dict() for target in result.targets]
-                        }
-                    }
-                ),
-                user_id=user_id,
-                auth_data={"user_id": user_id}
-            )
-            
-            if not artifact:
-                self.logger.error('Failed to create artifact')
-                # Continue anyway, don't fail the whole request
-            
-            artifact_id = artifact.get("id") if artifact else None
-            self.logger.success(f'Artifact created with ID: {artifact_id}')
-            
-            # Return response with session_id, artifact_id, and data
-            return {
-                "session_id": session_id,
-                "artifact_id": artifact_id,
-                "dependent_variables": [var.dict() for var in result.dependent_variables],
-                "independent_variables": [var.dict() for var in result.independent_variables],
-                "targets": [target.dict() for target in result.targets]
-            }
-            
-        except Exception as e:
-            self.logger.error(f'Error getting calc engine result with session: {e}')
-            raise e
+        self.logger.info(f'Getting calc engine result with session for name_ids: {name_ids}')
+        
+        # Get calculation engine result
+        result = await self.get_calc_engine_result(name_ids, plant_id)
+        
+        if not result:
+            return None
+        
+        # Create new chat session
+        session_id = str(uuid.uuid4())
+        created_session = await create_chat_session(db, session_id, user_id)
+        if not created_session:
+            self.logger.error('Failed to create session')
+            return None
+        
+        self.logger.success(f'Session created: {session_id}')
+        
+        # Serialize the result once; the same lists go into the content, the metadata and the response
+        calc_engine_data = result.model_dump()
+        
+        # Prepare artifact content with calc engine result
+        artifact_content = orjson.dumps(calc_engine_data, option=orjson.OPT_INDENT_2).decode()
+        
+        # Create artifact with calculation engine data
+        artifact = await self.artifact_service.create_artifact(
+            db=db,
+            artifact_data=ArtifactCreateSchema(
+                session_id=session_id,
+                title="Calculation Engine Result",
+                artifact_type=ArtifactType.ADVICE.value,
+                content=artifact_content,
+                artifact_metadata={
+                    "source": "calc_engine",
+                    "name_ids": name_ids,
+                    "plant_id": plant_id,
+                    "stage": "initial",
+                    "calc_engine_data": calc_engine_data
+                }
+            ),
+            user_id=user_id,
+            auth_data={"user_id": user_id}
+        )
+        
+        if not artifact:
+            self.logger.error('Failed to create artifact')
+            # Continue anyway, don't fail the whole request
+        
+        artifact_id = artifact.get("id") if artifact else None
+        self.logger.success(f'Artifact created with ID: {artifact_id}')
+        
+        # Return response with session_id, artifact_id, and data
+        return {
+            "session_id": session_id,
+            "artifact_id": artifact_id,
+            **calc_engine_data
+        }
     
-    async def _get_ai_response(self, context: Dict[str, Any], plant_id: str = None) -> Optional[Dict[str, Any]]:
-        """Get response from AI service"""
+    async def _get_ai_response(self, context: Dict[str, Any], plant_id: str = None) -> Tuple[Any, Optional[str]]:
+        """
+        Get response from AI service, both parsed and as the raw JSON text it was received in.
+        Returns (None, None) when the AI service does not answer within AI_AGENT_TOTAL_TIMEOUT.
+        """
         try:
-            if not AI_AGENT_URL:
+            if not settings.AI_AGENT_MANUAL_URL:
                 raise ValueError("AI service URL is not configured")
             
             # Prepare headers
@@ -327,23 +268,26 @@ class AdvisorService:
             if plant_id:
                 headers["Plant-Id"] = plant_id
             
-            # 3 minutes timeout
-            timeout = httpx.Timeout(1000.0)
-            
-            async with httpx.AsyncClient(timeout=timeout, verify=False) as client:
-                response = await client.post(
-                    AI_AGENT_URL,
+            # httpx timeouts apply per phase (a slowly streamed body can outlast the read timeout), so also bound the whole call
+            response = await asyncio.wait_for(
+                get_http_client().post(
+                    settings.AI_AGENT_MANUAL_URL,
                     json=context,
                     headers=headers
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    error_detail = response.text
-                    self.logger.error(f"AI service error response: {error_detail}")
-                    raise ValueError(f"AI service returned status: {response.status_code}, error: {error_detail}")
+                ),
+                timeout=settings.AI_AGENT_TOTAL_TIMEOUT
+            )
+            
+            if response.status_code == 200:
+                return orjson.loads(response.content), response.text
+            else:
+                error_detail = response.text
+                self.logger.error(f"AI service error response: {error_detail}")
+                raise ValueError(f"AI service returned status: {response.status_code}, error: {error_detail}")
                 
+        except (asyncio.TimeoutError, httpx.TimeoutException) as e:
+            self.logger.error(f'AI service timed out: {e!r}')
+            return None, None
         except Exception as e:
             self.logger.error(f'Failed to get AI response: {str(e)}')
             raise ValueError(str(e))
@@ -360,20 +304,19 @@ class AdvisorService:
         try:
             self.logger.info('Sending manual AI request')
             
-            # Step 1: Prepare the request data
+            # Step 1: Prepare the request data; each type dumps its data exactly once below
             ai_request_data = {
-                "data": manual_request.data.dict() if hasattr(manual_request.data, 'dict') else manual_request.data,
-                "question_type": manual_request.label.value,  # AI service expects "question_type" not "label"
+                "question_type": manual_request.label,  # AI service expects "question_type" not "label"
             }
             
             # Convert data to proper format based on type
             if manual_request.label == QuestionType.EXPLORE:
                 # For explore type, data should be a list of entities
-                ai_request_data["data"] = [entity.dict() for entity in manual_request.data]
+                ai_request_data["data"] = _ENTITIES_ADAPTER.dump_python(manual_request.data)
                 
             elif manual_request.label == QuestionType.VIEW:
                 # For view type, data should be TsQuerySchema dict
-                ai_request_data["data"] = manual_request.data.dict()
+                ai_request_data["data"] = manual_request.data.model_dump()
                 
             elif manual_request.label == QuestionType.ADVICE:
                 # Check if it's the simple format (AdvisorSimpleRequestSchema)
@@ -385,7 +328,7 @@ class AdvisorService:
                     self.logger.info(f"   📋 Extracted {len(name_ids)} name_ids from targets: {name_ids}")
                     
                     # Build complete recommendation schema with pairs and targets
-                    calc_engine_schema = await build_recommendation_schema(name_ids, plant_id)
+                    calc_engine_schema = await get_recommendation_schema(name_ids, plant_id)
                     self.logger.info(f"   ✅ Built schema with {len(calc_engine_schema.pairs)} pairs")
                     
                     # Update pairs with modified_limits
@@ -394,15 +337,15 @@ class AdvisorService:
                         updated_pairs = update_pairs(manual_request.data.modified_limits, calc_engine_schema.pairs)
                         calc_engine_schema.pairs = updated_pairs
                     
-                    # Update targets with new_value (target_value)
+                    # Update targets with new_value (target_value); the last update of a name_id wins
+                    new_values = {target_update.name_id: target_update.new_value for target_update in manual_request.data.targets}
                     for target in calc_engine_schema.targets:
-                        for target_update in manual_request.data.targets:
-                            if target.name_id == target_update.name_id:
-                                target.target_value = target_update.new_value
-                                self.logger.info(f"   ✅ Updated target {target.name_id}: target_value = {target.target_value}")
+                        if target.name_id in new_values:
+                            target.target_value = new_values[target.name_id]
+                            self.logger.info(f"   ✅ Updated target {target.name_id}: target_value = {target.target_value}")
                     
                     # Use the built schema
-                    ai_request_data["data"] = calc_engine_schema.dict(by_alias=True)
+                    ai_request_data["data"] = calc_engine_schema.model_dump(by_alias=True)
                     
                 else:
                     # Original format: RecommendationCalculationEngineSchema
@@ -412,24 +355,28 @@ class AdvisorService:
                         updated_pairs = update_pairs(manual_request.modified_limits, manual_request.data.pairs)
                         manual_request.data.pairs = updated_pairs
                     
-                    ai_request_data["data"] = manual_request.data.dict(by_alias=True)
+                    ai_request_data["data"] = manual_request.data.model_dump(by_alias=True)
+            
+            else:
+                ai_request_data["data"] = manual_request.data.model_dump() if hasattr(manual_request.data, 'model_dump') else manual_request.data
             
             # Step 2: Call the AI service first
-            starttime = datetime.now()
-            ai_response = await self._get_ai_response(ai_request_data, plant_id)
-            execution_time = (datetime.now() - starttime).total_seconds()
+            starttime = time.monotonic()
+            ai_response, raw_ai_response = await self._get_ai_response(ai_request_data, plant_id)
+            execution_time = time.monotonic() - starttime
             
             # Step 3: Only create/update session and message if AI responds successfully
             if ai_response:
                 try:
+                    existing_artifact = None
                     # Check if session_id is provided in request
                     if manual_request.session_id:
                         # Use existing session
                         session_id = manual_request.session_id
                         self.logger.info(f'Using existing session: {session_id}')
                         
-                        # Verify session exists and user has access
-                        existing_session = await get_chat_session(db, session_id)
+                        # Verify session exists and user has access; its latest artifact comes back in the same query
+                        existing_session, existing_artifact = await get_chat_session_with_latest_artifact(db, session_id, user_id)
                         if not existing_session or existing_session.user_id != user_id:
                             self.logger.error(f'Session {session_id} not found or access denied')
                             raise ValueError("Session not found or access denied")
@@ -444,17 +391,16 @@ class AdvisorService:
                         self.logger.success(f'Session created: {session_id}')
                     
                     # Create a dummy message in the session
-                    dummy_message = f"Manual AI request: {manual_request.label.value}"
+                    dummy_message = f"Manual AI request: {manual_request.label}"
                     
-                    # Create chat message record
-                    json_response = json.dumps(ai_response)
+                    # Create chat message record, storing the AI service's JSON as received instead of re-encoding it
                     chat_message = await create_chat_message(
                         db=db,
                         session_id=session_id,
                         user_id=user_id,
                         message=dummy_message,
                         execution_time=execution_time,
-                        response=json_response,
+                        response=raw_ai_response,
                         query="Manual AI request - direct response from AI service"
                     )
                     
@@ -463,13 +409,8 @@ class AdvisorService:
                     try:
                         # If session_id was provided, try to update existing artifact
                         if manual_request.session_id:
-                            # Get existing artifacts from session
-                            from queries.artifact_queries import get_artifacts_by_session
-                            existing_artifacts = await get_artifacts_by_session(db, session_id, user_id, skip=0, limit=1)
-                            
-                            if existing_artifacts and len(existing_artifacts) > 0:
-                                # Update the first artifact with AI response data in metadata
-                                existing_artifact = existing_artifacts[0]
+                            if existing_artifact is not None:
+                                # Update the latest artifact with AI response data in metadata
                                 self.logger.info(f'Updating existing artifact {existing_artifact.id} with advisor_simulated_data')
                                 
                                 # Update artifact with AI answer as content and advisor_simulated_data in metadata
@@ -500,17 +441,17 @@ class AdvisorService:
                         
                         # If no artifact was updated, create new ones from AI response
                         if not created_artifacts:
-                            for ai_item in ai_response:
-                                artifact = await self.artifact_service.create_artifact_from_ai_response(
-                                    db=db,
-                                    session_id=session_id,
-                                    user_id=user_id,
-                                    ai_response=ai_item,
-                                    message_id=chat_message.get('id') if chat_message and isinstance(chat_message, dict) else None
-                                )
-                                if artifact:
-                                    created_artifacts.append(artifact)
-                                    self.logger.info(f"Created artifact: {artifact.get('title', 'Untitled')}")
+                            # A single response object is one item, not a sequence of its keys
+                            ai_items = ai_response if isinstance(ai_response, list) else [ai_response]
+                            created_artifacts = await self.artifact_service.create_artifacts_from_ai_responses(
+                                db=db,
+                                session_id=session_id,
+                                user_id=user_id,
+                                ai_responses=ai_items,
+                                message_id=chat_message.get('id') if chat_message and isinstance(chat_message, dict) else None
+                            )
+                            for artifact in created_artifacts:
+                                self.logger.info(f"Created artifact: {artifact.get('title', 'Untitled')}")
                     except Exception as artifact_error:
                         self.logger.warning(f"Failed to create/update artifacts: {artifact_error}")
                         # Don't fail the main response if artifact creation fails
@@ -554,4 +495,4 @@ class AdvisorService:
             
         except Exception as e:
             self.logger.error(f'Error sending manual AI request: {e}')
-            raise e
\ No newline at end of file
+            raise
\ No newline at end of file
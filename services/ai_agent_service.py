@@ -1,33 +1,34 @@
-from dotenv import load_dotenv
-import httpx
 import json
+import orjson
+import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils.log import setup_logger
+import time
 import uuid
 from queries.chat_session_queries import (
     create_chat_session, get_chat_session, update_chat_session,
     get_user_sessions, get_starred_sessions, get_recent_sessions,
-    search_sessions, update_session_star, update_session_name, delete_session
+    search_sessions, update_session_star, update_session_fields, delete_session
 )
 from queries.chat_message_queries import (
     create_chat_message, get_session_messages, update_chat_message, delete_chat_message
 )
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple
 from datetime import datetime
 from serializers import format_history_response
 from middlewares.permission_middleware import can_access_session
+from middlewares.auth_middleware import get_user_id, is_admin
 from schemas.schema import AiResponseSchema, AnswerType, PlotType, QuestionType
 from services.artifact_service import ArtifactService
+from database import get_plant_db
+from core.config import settings
+from utils.http_client import get_http_client
+from utils.response import prefetch_first
 
 logger = setup_logger(__name__)
 
-load_dotenv('./../.env', override=True)
-
-AI_AGENT_URL = "http://38.128.233.128:8000/ai-agent/chat"
-
 class ChatService:
     def __init__(self):
-        self.http_client = httpx.AsyncClient(timeout=1000.0)
         self.artifact_service = ArtifactService()
     
     async def create_session(self, db: AsyncSession, user_id: int) -> str:
@@ -45,8 +46,12 @@ class ChatService:
             logger.error(f'Error creating session: {e}')
             raise e
         
-    async def send_message(self, db: AsyncSession, session_id: str, message: str, auth_data: Dict[str, Any], plant_context: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Process user message, execute SQL query, and return results"""
+    async def send_message(self, db: AsyncSession, session_id: str, message: str, auth_data: Dict[str, Any], plant_context: Dict[str, Any] = None) -> Tuple[Dict[str, Any], Optional[int]]:
+        """
+        Process user message, execute SQL query, and return results.
+        Returns (response, session owner's user_id); the owner is None if the session was never reached.
+        """
+        owner_id = None
         try:
             if not await can_access_session(db, session_id, auth_data):
                 raise ValueError("Access denied: You do not have permission to access this session.")
@@ -56,18 +61,18 @@ class ChatService:
                 logger.warning(f"Session {session_id} does not exist, creating it now")
                 await create_chat_session(db, session_id, auth_data.get("user_id"))
             # Update session timestamp
-            await update_chat_session(db, session_id=session_id)
+            owner_id = await update_chat_session(db, session_id=session_id)
             ai_request_schema = {
                 "input_message": message,
                 "session_id": session_id,
                 "plant_id": plant_context.get("plant_id") if plant_context else None
             }
             # Get response from AI service
-            starttime = datetime.now()
+            starttime = time.monotonic()
             ai_response = None
             try:
                 ai_response = await self.get_ai_response(ai_request_schema, plant_id=plant_context.get("plant_id") if plant_context else None)
-                execution_time = (datetime.now() - starttime).total_seconds()
+                execution_time = time.monotonic() - starttime
             except Exception as e:
                 logger.error(f'Error getting AI response: {e}')
                 error_response = {
@@ -91,8 +96,8 @@ class ChatService:
                     query="Error: AI service unavailable"
                 )
                 logger.warning(f'AI service unavailable, returning error response for message: {message}')
-                return error_response
-            execution_time = (datetime.now() - starttime).total_seconds()
+                return error_response, owner_id
+            execution_time = time.monotonic() - starttime
             if ai_response:
                 try:
                     response = {
@@ -116,17 +121,16 @@ class ChatService:
                     # Try to create artifacts from AI response and collect them
                     created_artifacts = []
                     try:
-                        for ai_item in ai_response:
-                            artifact = await self.artifact_service.create_artifact_from_ai_response(
-                                db=db,
-                                session_id=session_id,
-                                user_id=auth_data.get("user_id"),
-                                ai_response=ai_item,
-                                message_id=chat_message.get('id') if chat_message and isinstance(chat_message, dict) else None
-                            )
-                            if artifact:
-                                created_artifacts.append(artifact)
-                                logger.info(f"Created artifact: {artifact.get('title', 'Untitled')}")
+                        # All items share one insert and one commit instead of a round trip each
+                        created_artifacts = await self.artifact_service.create_artifacts_from_ai_responses(
+                            db=db,
+                            session_id=session_id,
+                            user_id=auth_data.get("user_id"),
+                            ai_responses=ai_response,
+                            message_id=chat_message.get('id') if chat_message and isinstance(chat_message, dict) else None
+                        )
+                        for artifact in created_artifacts:
+                            logger.info(f"Created artifact: {artifact.get('title', 'Untitled')}")
                     except Exception as artifact_error:
                         logger.warning(f"Failed to create artifacts: {artifact_error}")
                         # Don't fail the main response if artifact creation fails
@@ -135,7 +139,7 @@ class ChatService:
                     response["artifacts"] = created_artifacts
                     
                     logger.success(f'Message processed: {message}')
-                    return response
+                    return response, owner_id
                 except Exception as e:
                     logger.error(f'Error processing AI response: {e}')
                     error_response = {
@@ -158,7 +162,7 @@ class ChatService:
                         response=json.dumps([]),
                         query=f"Error processing AI response: {str(e)[:200]}"
                     )
-                    return error_response
+                    return error_response, owner_id
             else:
                 error_response = {
                     "session_id": session_id,
@@ -180,7 +184,7 @@ class ChatService:
                     response=json.dumps([]),
                     query="No response generated"
                 )
-                return error_response
+                return error_response, owner_id
         except Exception as e:
             logger.error(f'Error processing message: {e}')
             error_response = {
@@ -206,15 +210,18 @@ class ChatService:
                 )
             except Exception as db_error:
                 logger.error(f"Failed to store error in database: {db_error}")
-            return error_response
+            return error_response, owner_id
     
-    async def get_session_history(self, db: AsyncSession, session_id: str, auth_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Get the chat history for a session"""
+    async def get_session_history(self, db: AsyncSession, session_id: str, auth_data: Dict[str, Any], plant_id: str) -> AsyncGenerator[bytes, None]:
+        """
+        Check access to a session and return an async generator over its chat history as NDJSON lines.
+        
+        The generator opens its own plant database session, because the request-scoped one
+        is closed before a streamed response body is sent.
+        """
         try:
             if not await can_access_session(db, session_id, auth_data):
                 raise ValueError("Access denied: You do not have permission to access this session.")
-            messages = await get_session_messages(db, session_id)
-            logger.info(f"Retrieved {len(messages)} messages for session {session_id}")
             
             # Get artifacts for this session
             artifacts = await self.artifact_service.get_session_artifacts(
@@ -234,21 +241,25 @@ class ChatService:
                             message_artifacts_map[message_id] = []
                         message_artifacts_map[message_id].append(artifact["id"])
             
-            # Format history with message IDs and artifact IDs
-            history = []
-            for msg in messages:
-                formatted_msg = format_history_response(msg)
-                # Add message ID
-                formatted_msg["message_id"] = msg.id
-                # Add artifact IDs for this message
-                formatted_msg["artifact_ids"] = message_artifacts_map.get(msg.id, [])
-                history.append(formatted_msg)
-            
-            return history
+            # Fetch the first message now, so a failing query is reported by the handler instead of a cut-off stream
+            return await prefetch_first(self._stream_session_history(plant_id, session_id, message_artifacts_map))
         except Exception as e:
             logger.error(f'Error getting session history: {e}')
             raise e
     
+    async def _stream_session_history(self, plant_id: str, session_id: str, message_artifacts_map: Dict[int, List[int]]) -> AsyncGenerator[bytes, None]:
+        """Yield formatted history messages as NDJSON lines, with their message IDs and artifact IDs"""
+        message_count = 0
+        async for stream_db in get_plant_db(plant_id):
+            async for msg in get_session_messages(stream_db, session_id):
+                # The message body comes pre-serialized (and cached), so only the per-request ids are encoded here
+                formatted_msg = format_history_response(msg)
+                ids = orjson.dumps({"message_id": msg.id, "artifact_ids": message_artifacts_map.get(msg.id, [])})
+                message_count += 1
+                # Drop the closing brace of the message and the opening brace of the ids to splice them
+                yield formatted_msg[:-1] + b"," + ids[1:] + b"\n"
+        logger.info(f"Streamed {message_count} messages for session {session_id}")
+    
     async def get_session_info(self, db: AsyncSession, session_id: str, auth_data: Dict[str, Any]) -> Dict[str, Any]:
         """Get information about a chat session"""
         try:
@@ -266,89 +277,77 @@ class ChatService:
             logger.error(f'Error getting session info: {e}')
             raise e
     
-    async def get_user_sessions(self, db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_user_sessions(self, db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, after_updated_at: Optional[datetime] = None, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get all chat sessions for a user"""
         try:
-            sessions = await get_user_sessions(db, user_id, skip, limit)
-            return [self._format_session_response(session) for session in sessions]
+            sessions = await get_user_sessions(db, user_id, skip, limit, after_updated_at, after_id)
+            return [self._format_session_response(session, last_message) for session, last_message in sessions]
         except Exception as e:
             logger.error(f'Error getting user sessions: {e}')
             raise e
     
-    async def get_starred_sessions(self, db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_starred_sessions(self, db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, after_updated_at: Optional[datetime] = None, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get starred chat sessions for a user"""
         try:
-            sessions = await get_starred_sessions(db, user_id, skip, limit)
-            return [self._format_session_response(session) for session in sessions]
+            sessions = await get_starred_sessions(db, user_id, skip, limit, after_updated_at, after_id)
+            return [self._format_session_response(session, last_message) for session, last_message in sessions]
         except Exception as e:
             logger.error(f'Error getting starred sessions: {e}')
             raise e
     
-    async def get_recent_sessions(self, db: AsyncSession, user_id: int, days: int = 7, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_recent_sessions(self, db: AsyncSession, user_id: int, days: int = 7, skip: int = 0, limit: int = 100, after_updated_at: Optional[datetime] = None, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get recent chat sessions for a user"""
         try:
-            sessions = await get_recent_sessions(db, user_id, days, skip, limit)
-            return [self._format_session_response(session) for session in sessions]
+            sessions = await get_recent_sessions(db, user_id, days, skip, limit, after_updated_at, after_id)
+            return [self._format_session_response(session, last_message) for session, last_message in sessions]
         except Exception as e:
             logger.error(f'Error getting recent sessions: {e}')
             raise e
     
-    async def search_sessions(self, db: AsyncSession, user_id: int, search_term: str, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    async def search_sessions(self, db: AsyncSession, user_id: int, search_term: str, skip: int = 0, limit: int = 100, after_updated_at: Optional[datetime] = None, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Search chat sessions for a user"""
         try:
-            sessions = await search_sessions(db, user_id, search_term, skip, limit)
-            return [self._format_session_response(session) for session in sessions]
+            sessions = await search_sessions(db, user_id, search_term, skip, limit, after_updated_at, after_id)
+            return [self._format_session_response(session, last_message) for session, last_message in sessions]
         except Exception as e:
             logger.error(f'Error searching sessions: {e}')
             raise e
     
-    async def update_session_star(self, db: AsyncSession, session_id: str, is_starred: bool, auth_data: Dict[str, Any]) -> bool:
-        """Update starred status of a chat session"""
+    async def update_session_star(self, db: AsyncSession, session_id: str, is_starred: bool, auth_data: Dict[str, Any]) -> Optional[int]:
+        """Update starred status of a chat session; returns the session owner's user_id, or None if not found/accessible"""
         try:
-            if not await can_access_session(db, session_id, auth_data):
-                raise ValueError("Access denied: You do not have permission to access this session.")
-            await update_session_star(db, session_id, is_starred)
-            return True
+            return await update_session_star(db, session_id, is_starred, get_user_id(auth_data), is_admin(auth_data))
         except Exception as e:
             logger.error(f'Error updating session star status: {e}')
             raise e
     
-    async def update_session_name(self, db: AsyncSession, session_id: str, chat_name: str, auth_data: Dict[str, Any]) -> bool:
-        """Update name of a chat session"""
+    async def update_session_fields(self, db: AsyncSession, session_id: str, auth_data: Dict[str, Any], chat_name: Optional[str] = None, is_starred: Optional[bool] = None) -> Optional[int]:
+        """Update name and/or starred status of a chat session in one statement; returns the session owner's user_id, or None if not found/accessible"""
         try:
-            if not await can_access_session(db, session_id, auth_data):
-                raise ValueError("Access denied: You do not have permission to access this session.")
-            await update_session_name(db, session_id, chat_name)
-            return True
+            return await update_session_fields(db, session_id, get_user_id(auth_data), is_admin(auth_data), chat_name, is_starred)
         except Exception as e:
-            logger.error(f'Error updating session name: {e}')
+            logger.error(f'Error updating session fields: {e}')
             raise e
     
-    async def delete_session(self, db: AsyncSession, session_id: str, auth_data: Dict[str, Any]) -> bool:
-        """Delete a chat session and all associated messages and artifacts"""
+    async def delete_session(self, db: AsyncSession, session_id: str, auth_data: Dict[str, Any]) -> Optional[int]:
+        """Delete a chat session and all associated messages and artifacts; returns the session owner's user_id, or None if not found/accessible"""
         try:
-            if not await can_access_session(db, session_id, auth_data):
-                raise ValueError("Access denied: You do not have permission to access this session.")
-            result = await delete_session(db, session_id)
-            if not result:
-                raise ValueError(f"Session {session_id} not found")
-            return True
+            return await delete_session(db, session_id, get_user_id(auth_data), is_admin(auth_data))
         except Exception as e:
             logger.error(f'Error deleting session: {e}')
             raise e
     
-    async def update_message(self, db: AsyncSession, message_id: int, message: str, auth_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update a chat message"""
+    async def update_message(self, db: AsyncSession, message_id: int, message: str, auth_data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+        """Update a chat message; returns (updated message, session owner's user_id), or (None, None) if not found/accessible"""
         try:
             user_id = auth_data.get("user_id")
-            updated_message = await update_chat_message(db, message_id, message, user_id)
-            return updated_message
+            return await update_chat_message(db, message_id, message, user_id)
         except Exception as e:
             logger.error(f'Error updating message: {e}')
             raise e
     
-    async def delete_message(self, db: AsyncSession, message_id: int, auth_data: Dict[str, Any]) -> bool:
-        """Delete a chat message"""
+    async def delete_message(self, db: AsyncSession, message_id: int, auth_data: Dict[str, Any]) -> Optional[int]:
+        """Delete a chat message; returns the session owner's user_id, or None if not found/accessible"""
         try:
             user_id = auth_data.get("user_id")
             return await delete_chat_message(db, message_id, user_id)
@@ -356,16 +355,14 @@ class ChatService:
             logger.error(f'Error deleting message: {e}')
             raise e
     
-    def _format_session_response(self, session) -> Dict[str, Any]:
+    def _format_session_response(self, session, last_message: Optional[str] = None) -> Dict[str, Any]:
         """Format session response with additional metadata"""
         try:
-            # Get last message info if available
-            last_message = None
-            last_message_time = None
-            message_count = 0
+            # Message count and last message time are denormalized on the session by create_chat_message,
+            # the last message text is joined in by the session list queries
+            last_message_time = session.last_message_at.isoformat() if session.last_message_at else None
+            message_count = session.message_count or 0
             
-            # This would need to be optimized with a proper join query in production
-            # For now, we'll set basic info
             return {
                 "id": session.id,
                 "session_id": session.session_id,
@@ -396,17 +393,14 @@ class ChatService:
             }
 
     async def get_ai_response(self, context: Dict[str, Any], plant_id: str = None) -> Optional[List[Dict[str, Any]]]:
-        """Get response from AI service"""
+        """Get response from AI service; raises httpx.TimeoutException when it does not answer within AI_AGENT_CHAT_TIMEOUT"""
         try:
-            logger.info(f'AI_AGENT_URL = {AI_AGENT_URL}')
+            logger.info(f'AI_AGENT_CHAT_URL = {settings.AI_AGENT_CHAT_URL}')
             
-            if not AI_AGENT_URL:
-                logger.error('AI_AGENT_URL is not set!')
+            if not settings.AI_AGENT_CHAT_URL:
+                logger.error('AI_AGENT_CHAT_URL is not set!')
                 raise ValueError("AI service URL is not configured")
             
-            # 3 minutes timeout
-            timeout = httpx.Timeout(1000.0)
-            
             logger.info('Starting AI request - this may take around 1 minute...')
             
             # Prepare headers
@@ -417,55 +411,61 @@ class ChatService:
             else:
                 logger.warning('No plant_id provided for AI request')
             
-            async with httpx.AsyncClient(timeout=timeout, verify=False) as client:
-                response = await client.post(
-                    AI_AGENT_URL,
-                    json=context,
-                    headers=headers
-                )
-                
-                logger.info(f'Response status: {response.status_code}')
-                if response.status_code == 200:
-                    try:
-                        response_data = response.json()
-                        
-                        # Handle the new schema format
-                        if isinstance(response_data, list) and len(response_data) > 0:
-                            logger.success('Received JSON response array from AI!')
-                            # Validate each response against the schema
-                            validated_responses = []
-                            for item in response_data:
-                                try:
-                                    # Try to parse as AiResponseSchema
-                                    validated_item = AiResponseSchema(**item)
-                                    validated_responses.append(validated_item.dict())
-                                except Exception as validation_error:
-                                    logger.warning(f"Response item validation failed: {validation_error}")
-                                    # Fallback to original item if validation fails
-                                    validated_responses.append(item)
-                            return validated_responses
-                        elif isinstance(response_data, dict):
-                            logger.success('Received JSON response object from AI!')
+            # Chat answers can take much longer than manual requests, so chat overrides the shared client's
+            # read/write/pool timeouts: a burst of chats waits for a pooled connection instead of failing fast
+            response = await get_http_client().post(
+                settings.AI_AGENT_CHAT_URL,
+                json=context,
+                headers=headers,
+                timeout=httpx.Timeout(settings.AI_AGENT_CHAT_TIMEOUT, connect=settings.AI_AGENT_CONNECT_TIMEOUT)
+            )
+            
+            logger.info(f'Response status: {response.status_code}')
+            if response.status_code == 200:
+                try:
+                    response_data = orjson.loads(response.content)
+                    
+                    # Handle the new schema format
+                    if isinstance(response_data, list) and len(response_data) > 0:
+                        logger.success('Received JSON response array from AI!')
+                        # Validate each response against the schema
+                        validated_responses = []
+                        for item in response_data:
                             try:
                                 # Try to parse as AiResponseSchema
-                                validated_item = AiResponseSchema(**response_data)
-                                return [validated_item.dict()]
+                                validated_item = AiResponseSchema(**item)
+                                validated_responses.append(validated_item.model_dump())
                             except Exception as validation_error:
-                                logger.warning(f"Response validation failed: {validation_error}")
-                                # Fallback to original response if validation fails
-                                return [response_data]
-                        else:
-                            logger.error(f'Unexpected response format: {response_data}')
-                            raise ValueError("AI service returned an invalid response format")
-                    except Exception as json_error:
-                        logger.error(f'Error parsing JSON response: {json_error}')
-                        raise ValueError(f"Failed to parse AI service response: {str(json_error)}")
-                else:
-                    logger.error(f'Error from AI service: Status {response.status_code}, Response: {response.text[:200]}')
-                    raise ValueError(f"AI service returned status: {response.status_code}")
-                
+                                logger.warning(f"Response item validation failed: {validation_error}")
+                                # Fallback to original item if validation fails
+                                validated_responses.append(item)
+                        return validated_responses
+                    elif isinstance(response_data, dict):
+                        logger.success('Received JSON response object from AI!')
+                        try:
+                            # Try to parse as AiResponseSchema
+                            validated_item = AiResponseSchema(**response_data)
+                            return [validated_item.model_dump()]
+                        except Exception as validation_error:
+                            logger.warning(f"Response validation failed: {validation_error}")
+                            # Fallback to original response if validation fails
+                            return [response_data]
+                    else:
+                        logger.error(f'Unexpected response format: {response_data}')
+                        raise ValueError("AI service returned an invalid response format")
+                except Exception as json_error:
+                    logger.error(f'Error parsing JSON response: {json_error}')
+                    raise ValueError(f"Failed to parse AI service response: {str(json_error)}")
+            else:
+                logger.error(f'Error from AI service: Status {response.status_code}, Response: {response.text[:200]}')
+                raise ValueError(f"AI service returned status: {response.status_code}")
+            
             raise ValueError("Failed to get a valid response from the AI service")
                 
+        except httpx.TimeoutException as e:
+            # Propagated as-is, so send_message reports the AI service as unavailable
+            logger.error(f'AI service timed out: {e!r}')
+            raise
         except Exception as e:
             logger.error(f'Failed to get AI response: {str(e)}')
             raise ValueError(str(e))
@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncGenerator
+from datetime import datetime
 from queries.artifact_queries import (
     create_artifact,
+    create_artifacts,
     get_artifact_by_id,
     get_artifacts_by_session,
     get_artifacts_count_by_session,
@@ -9,10 +11,8 @@ from queries.artifact_queries import (
     delete_artifact,
     get_artifacts_by_type,
     search_artifacts,
-    get_all_user_artifacts,
     get_user_artifacts_count,
-    get_user_artifacts_by_type,
-    search_user_artifacts
+    stream_user_artifacts
 )
 from schemas.schema import (
     ArtifactCreateSchema,
@@ -23,6 +23,7 @@ from schemas.schema import (
 )
 from utils.log import setup_logger
 from middlewares.permission_middleware import can_access_session
+from database import get_plant_db
 import json
 
 logger = setup_logger(__name__)
@@ -31,48 +32,41 @@ class ArtifactService:
     def __init__(self):
         pass
     
-    async def create_artifact_from_ai_response(
+    async def create_artifacts_from_ai_responses(
         self,
         db: AsyncSession,
         session_id: str,
         user_id: int,
-        ai_response: Dict[str, Any],
+        ai_responses: List[Any],
         message_id: Optional[int] = None
-    ) -> Optional[Dict[str, Any]]:
-        """Create artifacts from AI response data"""
-        try:
-            # Check if AI response contains artifact data
-            if not self._has_artifact_data(ai_response):
-                logger.info("No artifact data found in AI response")
-                return None
-            
-            # Extract artifact information from AI response
-            artifact_data = self._extract_artifact_data(ai_response)
-            
-            if not artifact_data:
-                logger.info("Could not extract artifact data from AI response")
-                return None
-            
-            # Create artifact
-            artifact = await create_artifact(
-                db=db,
-                session_id=session_id,
-                user_id=user_id,
-                title=artifact_data.get("title", "AI Generated Artifact"),
-                content=artifact_data.get("content", ""),
-                artifact_type=artifact_data.get("type", "general"),
-                artifact_metadata=artifact_data.get("metadata"),
-                message_id=message_id
-            )
-            
-            if artifact:
-                logger.success(f"Created artifact {artifact.id} from AI response")
-                return self._format_artifact_response(artifact)
-            
-            return None
-        except Exception as e:
-            logger.error(f"Error creating artifact from AI response: {e}")
-            return None
+    ) -> List[Dict[str, Any]]:
+        """Create the artifacts of several AI response items with a single insert transaction"""
+        artifacts_data = []
+        for ai_response in ai_responses:
+            try:
+                if not isinstance(ai_response, dict) or not self._has_artifact_data(ai_response):
+                    continue
+                artifact_data = self._extract_artifact_data(ai_response)
+                if not artifact_data:
+                    continue
+                artifacts_data.append({
+                    "session_id": session_id,
+                    "user_id": user_id,
+                    "title": artifact_data.get("title", "AI Generated Artifact"),
+                    "content": artifact_data.get("content", ""),
+                    "artifact_type": artifact_data.get("type", "general"),
+                    "artifact_metadata": artifact_data.get("metadata"),
+                    "message_id": message_id
+                })
+            except Exception as e:
+                logger.error(f"Error extracting artifact from AI response: {e}")
+        
+        if not artifacts_data:
+            logger.info("No artifact data found in AI response")
+            return []
+        
+        artifacts = await create_artifacts(db, artifacts_data)
+        return [self._format_artifact_response(artifact) for artifact in artifacts]
     
     def _has_artifact_data(self, ai_response: Dict[str, Any]) -> bool:
         """Check if AI response contains artifact data"""
@@ -266,7 +260,7 @@ class ArtifactService:
                 user_id=user_id,
                 title=artifact_data.title,
                 content=artifact_data.content,
-                artifact_type=artifact_data.artifact_type.value,
+                artifact_type=artifact_data.artifact_type,
                 artifact_metadata=artifact_data.artifact_metadata,
                 message_id=artifact_data.message_id
             )
@@ -418,60 +412,27 @@ class ArtifactService:
     # USER ARTIFACTS METHODS (across all sessions)
     # =============================================================================
     
-    async def get_all_user_artifacts(
-        self,
-        db: AsyncSession,
-        user_id: int,
-        auth_data: Dict[str, Any],
-        skip: int = 0,
-        limit: int = 100
-    ) -> Optional[Dict[str, Any]]:
-        """Get all artifacts for a user across all sessions"""
-        try:
-            artifacts = await get_all_user_artifacts(db, user_id, skip, limit)
-            total_count = await get_user_artifacts_count(db, user_id)
-            
-            formatted_artifacts = [self._format_artifact_response(artifact) for artifact in artifacts]
-            
-            return {
-                "artifacts": formatted_artifacts,
-                "total_count": total_count,
-                "user_id": user_id
-            }
-        except Exception as e:
-            logger.error(f"Error getting all artifacts for user {user_id}: {e}")
-            return None
-    
-    async def get_user_artifacts_by_type(
-        self,
-        db: AsyncSession,
-        user_id: int,
-        artifact_type: str,
-        auth_data: Dict[str, Any],
-        skip: int = 0,
-        limit: int = 100
-    ) -> Optional[List[Dict[str, Any]]]:
-        """Get user artifacts by type across all sessions"""
-        try:
-            artifacts = await get_user_artifacts_by_type(db, user_id, artifact_type, skip, limit)
-            return [self._format_artifact_response(artifact) for artifact in artifacts]
-        except Exception as e:
-            logger.error(f"Error getting {artifact_type} artifacts for user {user_id}: {e}")
-            return None
+    async def get_user_artifacts_count(self, db: AsyncSession, user_id: int) -> int:
+        """Count the active artifacts of a user across all sessions"""
+        return await get_user_artifacts_count(db, user_id)
     
-    async def search_user_artifacts(
+    async def stream_user_artifacts(
         self,
-        db: AsyncSession,
+        plant_id: str,
         user_id: int,
-        search_term: str,
-        auth_data: Dict[str, Any],
         skip: int = 0,
-        limit: int = 100
-    ) -> Optional[List[Dict[str, Any]]]:
-        """Search user artifacts across all sessions"""
-        try:
-            artifacts = await search_user_artifacts(db, user_id, search_term, skip, limit)
-            return [self._format_artifact_response(artifact) for artifact in artifacts]
-        except Exception as e:
-            logger.error(f"Error searching artifacts for user {user_id}: {e}")
-            return None
\ No newline at end of file
+        limit: int = 100,
+        after_updated_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+        artifact_type: Optional[str] = None,
+        search_term: Optional[str] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Yield formatted user artifacts, optionally filtered by type and/or search term, one at a time.
+        
+        Opens its own plant database session, because the request-scoped one
+        is closed before a streamed response body is sent.
+        """
+        async for stream_db in get_plant_db(plant_id):
+            async for artifact in stream_user_artifacts(stream_db, user_id, skip, limit, after_updated_at, after_id, artifact_type, search_term):
+                yield self._format_artifact_response(artifact)
@@ -4,45 +4,47 @@ from queries.calculation_engine_queries import RECOMMENDATION_TEMPLATE
 from utils.log import setup_logger
 from services.query_service import KnowledgeGraph, QueryService
 from database import get_plant_db
+from utils.cache import cached_recommendation_schema
 from pydantic import TypeAdapter
 
 logger = setup_logger(__name__)
 
+# Built once: constructing a TypeAdapter compiles a new core validator each time
+_PAIRS_ADAPTER = TypeAdapter(List[RecommendationCalculationEnginePairSchema])
+
+def _append_unique(elements: List[RecommendationElementSchema], seen: Dict[str, List[RecommendationElementSchema]], element: RecommendationElementSchema):
+    """Append element unless an equal one was already added; equality is only checked among elements with the same name_id"""
+    same_name = seen.setdefault(element.name_id, [])
+    if element not in same_name:
+        same_name.append(element)
+        elements.append(element)
+
 def divide_dependent_independent(input:RecommendationCalculationEngineSchema)->Tuple[List[RecommendationElementSchema],List[RecommendationElementSchema],List[RecommendationElementSchema]]:
     if not input.pairs:
         logger.debug_high_level(":warning: No pairs found, returning empty results")
         return input.targets, [], []
-    variables_name = []
-    from_node_name = []
-    independent_variables_name = []
-    target_variables_data = []
-    targets_name_ids = [target.name_id for target in input.targets]
-    for item in input.pairs:
-        if item.from_.name_id not in variables_name:
-            variables_name.append(item.from_.name_id)
-        if item.to_.name_id not in variables_name:
-            variables_name.append(item.to_.name_id)
-        if item.from_.name_id not in from_node_name:
-            from_node_name.append(item.from_.name_id)
-    for item in variables_name:
-        if item not in from_node_name and item not in independent_variables_name and item not in targets_name_ids:  #SO, IF IT DOESN'T APPEAR IN THE FROM DICTIONARY, SO IT'S NOT AFFECTED FROM NOTHING
-            independent_variables_name.append(item)
-    independent_variables_data = []
-    for item in input.pairs:
-        if item.to_.name_id in independent_variables_name and item.to_ not in independent_variables_data:
-            independent_variables_data.append(item.to_)
-        if item.to_.name_id in targets_name_ids and item.to_ not in target_variables_data:
-            target_variables_data.append(item.to_)
-    dependent_variables_name = []
-    for item in variables_name:
-        if item not in independent_variables_name and item not in dependent_variables_name and item not in targets_name_ids:
-            dependent_variables_name.append(item)
-    dependent_variables_data = []
-    for item in input.pairs:
-        if item.from_.name_id in dependent_variables_name and item.from_ not in dependent_variables_data:
-            dependent_variables_data.append(item.from_)
-        if item.from_.name_id in targets_name_ids and item.from_ not in target_variables_data:
-            target_variables_data.append(item.from_)
+    # Column views of the pairs, built in one pass; classification then works on name sets
+    from_nodes = [item.from_ for item in input.pairs]
+    to_nodes = [item.to_ for item in input.pairs]
+    targets_name_ids = {target.name_id for target in input.targets}
+    from_node_name = {node.name_id for node in from_nodes}
+    # A variable that never appears on the "from" side is not affected by anything
+    independent_variables_name = {node.name_id for node in to_nodes} - from_node_name - targets_name_ids
+    dependent_variables_name = from_node_name - targets_name_ids
+    
+    target_variables_data, seen_targets = [], {}
+    independent_variables_data, seen_independent = [], {}
+    for node in to_nodes:
+        if node.name_id in independent_variables_name:
+            _append_unique(independent_variables_data, seen_independent, node)
+        if node.name_id in targets_name_ids:
+            _append_unique(target_variables_data, seen_targets, node)
+    dependent_variables_data, seen_dependent = [], {}
+    for node in from_nodes:
+        if node.name_id in dependent_variables_name:
+            _append_unique(dependent_variables_data, seen_dependent, node)
+        if node.name_id in targets_name_ids:
+            _append_unique(target_variables_data, seen_targets, node)
     return target_variables_data, dependent_variables_data, independent_variables_data
 
 async def build_recommendation_schema(name_ids: List[str], plant_id: str) -> RecommendationCalculationEngineSchema:
@@ -134,6 +136,18 @@ async def build_recommendation_schema(name_ids: List[str], plant_id: str) -> Rec
     logger.info(f"✅ Built recommendation schema with {len(calc_engine_request.pairs)} pairs and {len(calc_engine_request.targets)} targets")
     return calc_engine_request
 
+async def get_recommendation_schema(name_ids: List[str], plant_id: str) -> RecommendationCalculationEngineSchema:
+    """
+    Get the recommendation schema for name_ids, reusing one built in the last RECOMMENDATION_SCHEMA_CACHE_TTL seconds.
+    
+    Every call returns a new model, so callers may update its pairs and targets in place.
+    """
+    async def load():
+        schema = await build_recommendation_schema(name_ids, plant_id)
+        return schema.model_dump(by_alias=True)
+    
+    return RecommendationCalculationEngineSchema.model_validate(await cached_recommendation_schema(plant_id, name_ids, load))
+
 
 async def build_execute_recommendation_query(name_ids: List[str], plant_id: str) -> Tuple[List[RecommendationElementSchema], List[RecommendationElementSchema]]:
     """
@@ -291,7 +305,7 @@ def update_pairs(
     logger.info(f"🔄 Updating pairs with {len(new_limits_value)} new limit values")
     
     # Validate pairs using TypeAdapter
-    pairs = TypeAdapter(List[RecommendationCalculationEnginePairSchema]).validate_python(pairs)
+    pairs = _PAIRS_ADAPTER.validate_python(pairs)
     
     # Iterate through each pair
     for pair in pairs:
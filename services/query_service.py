@@ -1,6 +1,7 @@
 # services/query_service.py
 import re
 import time
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple, Optional, AsyncGenerator
 from utils.log import setup_logger
 from sqlalchemy import text
@@ -13,6 +14,50 @@ from tqdm import tqdm
 
 logger = setup_logger(__name__)
 
+@lru_cache(maxsize=2048)
+def _transform_query(original_query: str, column_mapping: Optional[Tuple[Tuple[str, str], ...]] = None) -> str:
+    """Wrap a query in a WITH clause that standardizes its column names (column_mapping as ordered pairs)"""
+    # Default column mapping if none provided
+    column_mapping = dict(column_mapping) if column_mapping else {
+        "bucket": "timestamp",
+        "avg_value": "value", 
+        "name": "tag_id"
+    }
+    
+    # Detect query type
+    is_time_bucket = "time_bucket" in original_query.lower()
+    
+    # Clean up the query (remove leading/trailing whitespace and newlines)
+    cleaned_query = original_query.strip()
+    
+    # Wrap in WITH clause
+    if is_time_bucket:
+        # For time_bucket queries, use the specific column mapping
+        select_clause = ", ".join([
+            f"{original} AS {new_name}"
+            for original, new_name in column_mapping.items()
+        ])
+        
+        transformed_query = f"""
+        WITH original_query AS (
+            {cleaned_query}
+        )
+        SELECT
+            {select_clause}
+        FROM original_query
+        ORDER BY {column_mapping.get('bucket', 'timestamp')}, {column_mapping.get('name', 'tag_id')};
+        """
+    else:
+        # For other queries, make a best guess at the structure
+        transformed_query = f"""
+        WITH original_query AS (
+            {cleaned_query}
+        )
+        SELECT * FROM original_query;
+        """
+    
+    return transformed_query
+
 class QueryService:
     """
     Service for transforming and executing queries
@@ -46,46 +91,8 @@ class QueryService:
         return transformed_query
     async def transform_query(self, original_query: str, column_mapping: Optional[Dict[str, str]] = None) -> str:
         logger.info("Transforming query") 
-        # Default column mapping if none provided
-        if not column_mapping:
-            column_mapping = {
-                "bucket": "timestamp",
-                "avg_value": "value", 
-                "name": "tag_id"
-            }
-        
-        # Detect query type
-        is_time_bucket = "time_bucket" in original_query.lower()
-        
-        # Clean up the query (remove leading/trailing whitespace and newlines)
-        cleaned_query = original_query.strip()
-        
-        # Wrap in WITH clause
-        if is_time_bucket:
-            # For time_bucket queries, use the specific column mapping
-            select_clause = ", ".join([
-                f"{original} AS {new_name}"
-                for original, new_name in column_mapping.items()
-            ])
-            
-            transformed_query = f"""
-            WITH original_query AS (
-                {cleaned_query}
-            )
-            SELECT
-                {select_clause}
-            FROM original_query
-            ORDER BY {column_mapping.get('bucket', 'timestamp')}, {column_mapping.get('name', 'tag_id')};
-            """
-        else:
-            # For other queries, make a best guess at the structure
-            transformed_query = f"""
-            WITH original_query AS (
-                {cleaned_query}
-            )
-            SELECT * FROM original_query;
-            """
-        
+        # The transformation is deterministic, so identical queries are served from the LRU cache
+        transformed_query = _transform_query(original_query, tuple(column_mapping.items()) if column_mapping else None)
         logger.info("Query transformation complete")
         return transformed_query
     
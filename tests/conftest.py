@@ -0,0 +1,7 @@
+import os
+
+# Importing main builds the central engine from these settings; no connection is opened at import time
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_NAME", "test")
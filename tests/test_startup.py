@@ -0,0 +1,44 @@
+"""Smoke tests: the application imports and its routes register without touching the databases"""
+from fastapi.testclient import TestClient
+
+
+def test_app_imports_and_registers_routes():
+    from main import app
+    paths = {route.path for route in app.routes}
+    assert "/api/v1/session/{session_id}/star" in paths
+    assert "/api/v1/session/{session_id}" in paths
+    assert "/api/v1/user/sessions" in paths
+
+
+def test_unauthenticated_endpoint_responds():
+    from main import app
+    # No context manager: startup (database init, HTTP warm-up) is not run
+    client = TestClient(app)
+    response = client.get("/test")
+    assert response.status_code == 200
+    assert response.json()["status"] == "success"
+
+
+def test_unhandled_errors_keep_cors_headers():
+    from main import app
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    async def missing():
+        raise ValueError("not found")
+
+    app.add_api_route("/_test/boom", boom)
+    app.add_api_route("/_test/missing", missing)
+    client = TestClient(app, raise_server_exceptions=False)
+    headers = {"Origin": "http://example.com"}
+
+    response = client.get("/_test/boom", headers=headers)
+    assert response.status_code == 500
+    assert response.json()["message"] == "boom"
+    assert "access-control-allow-origin" in response.headers
+
+    response = client.get("/_test/missing", headers=headers)
+    assert response.status_code == 404
+    assert response.json()["message"] == "not found"
+    assert "access-control-allow-origin" in response.headers
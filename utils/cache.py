@@ -0,0 +1,149 @@
+import hashlib
+import time
+import orjson
+from typing import Any, Awaitable, Callable, List, Optional
+import redis.asyncio as redis
+from core.config import settings
+from utils.log import setup_logger
+
+logger = setup_logger(__name__)
+
+# Shared Redis client, created on first use. The cache is best-effort: if Redis is
+# unreachable every helper falls back to the loader / no-op instead of failing the request.
+_redis_client: Optional[redis.Redis] = None
+
+def get_redis() -> redis.Redis:
+    """Get the shared Redis client"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+    return _redis_client
+
+async def close_redis():
+    """Close the shared Redis client (called on application shutdown)"""
+    global _redis_client
+    if _redis_client is None:
+        return
+    await _redis_client.aclose()
+    _redis_client = None
+
+async def cached_json(key: str, ttl: int, loader: Callable[[], Awaitable[Any]], index_key: Optional[str] = None) -> Any:
+    """
+    Return the JSON value cached under key, or call loader and cache its result.
+
+    Args:
+        key: Redis key of the cached value
+        ttl: Time to live in seconds
+        loader: Coroutine function producing the value on a cache miss
+        index_key: Optional Redis set the key is registered in, for invalidate_index()
+
+    Returns:
+        The cached or freshly loaded value
+    """
+    client = get_redis()
+    try:
+        cached = await client.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.warning(f"Redis read failed for {key}: {e}")
+        return await loader()
+
+    value = await loader()
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.setex(key, ttl, orjson.dumps(value, default=str))
+            if index_key:
+                pipe.sadd(index_key, key)
+                pipe.expire(index_key, ttl)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Redis write failed for {key}: {e}")
+    return value
+
+async def invalidate_index(index_key: str, *extra_keys: str):
+    """Delete every key registered in index_key, the index itself and any extra_keys"""
+    client = get_redis()
+    try:
+        keys = await client.smembers(index_key)
+        await client.delete(index_key, *extra_keys, *keys)
+    except Exception as e:
+        logger.warning(f"Redis invalidation failed for {index_key}: {e}")
+
+# =============================================================================
+# SESSION LIST CACHE
+# =============================================================================
+
+def session_list_index_key(plant_id: str, user_id: int) -> str:
+    """Redis set holding every cached session list key of a user in a plant"""
+    return f"sessions:index:{plant_id}:{user_id}"
+
+def session_list_version_key(plant_id: str, user_id: int) -> str:
+    """Redis key holding the version token of a user's session lists in a plant"""
+    return f"sessions:ver:{plant_id}:{user_id}"
+
+def session_list_cache_key(plant_id: str, user_id: int, kind: str, *parts: Any) -> str:
+    """Build the cache key of one session list page (free text parts are hashed)"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f"sessions:{plant_id}:{user_id}:{kind}:{digest}"
+
+async def cached_session_list(plant_id: str, user_id: int, kind: str, parts: tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """Cache a session list page for SESSION_LIST_CACHE_TTL seconds"""
+    return await cached_json(
+        session_list_cache_key(plant_id, user_id, kind, *parts),
+        settings.SESSION_LIST_CACHE_TTL,
+        loader,
+        index_key=session_list_index_key(plant_id, user_id)
+    )
+
+async def session_list_etag(plant_id: str, user_id: int, kind: str, *parts: Any) -> Optional[str]:
+    """
+    Build the weak ETag of one session list page from the user's list version.
+
+    The version is a token (creation time in ns) kept for SESSION_LIST_ETAG_TTL seconds, capped at
+    SESSION_LIST_CACHE_TTL so a write that misses invalidation is never answered with a 304 for longer
+    than the cached page itself would be served. Invalidation deletes it and the next read creates a
+    new one, so an old ETag never matches again.
+
+    Returns:
+        The ETag, or None when Redis is unavailable (the response is then sent without one)
+    """
+    key = session_list_version_key(plant_id, user_id)
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.set(key, time.time_ns(), nx=True, ex=min(settings.SESSION_LIST_ETAG_TTL, settings.SESSION_LIST_CACHE_TTL))
+            pipe.get(key)
+            _, version = await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Redis read failed for {key}: {e}")
+        return None
+    if version is None:
+        return None
+    digest = hashlib.sha1("|".join(str(part) for part in (kind, *parts)).encode()).hexdigest()[:16]
+    return f'W/"{user_id}-{version.decode()}-{digest}"'
+
+async def invalidate_session_lists(plant_id: str, user_id: int):
+    """Drop every cached session list page of a user in a plant and bump their list version"""
+    await invalidate_index(session_list_index_key(plant_id, user_id), session_list_version_key(plant_id, user_id))
+
+# =============================================================================
+# RECOMMENDATION SCHEMA CACHE
+# =============================================================================
+
+def recommendation_schema_cache_key(plant_id: str, name_ids: List[str]) -> str:
+    """Build the cache key of the recommendation schema for name_ids (order matters: it is the targets' order)"""
+    digest = hashlib.sha1("|".join(name_ids).encode()).hexdigest()
+    return f"recommendation_schema:{plant_id}:{digest}"
+
+async def cached_recommendation_schema(plant_id: str, name_ids: List[str], loader: Callable[[], Awaitable[Any]]) -> Any:
+    """Cache a dumped recommendation schema for RECOMMENDATION_SCHEMA_CACHE_TTL seconds"""
+    return await cached_json(
+        recommendation_schema_cache_key(plant_id, name_ids),
+        settings.RECOMMENDATION_SCHEMA_CACHE_TTL,
+        loader
+    )
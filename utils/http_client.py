@@ -0,0 +1,43 @@
+from typing import Optional
+import httpx
+from core.config import settings
+from utils.log import setup_logger
+
+logger = setup_logger(__name__)
+
+# Shared client for calls to the AI agent, created on first use so its connection pool
+# (and the TCP/TLS handshakes behind it) is reused across requests instead of rebuilt per call
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                connect=settings.AI_AGENT_CONNECT_TIMEOUT,
+                read=settings.AI_AGENT_READ_TIMEOUT,
+                write=settings.AI_AGENT_WRITE_TIMEOUT,
+                pool=settings.AI_AGENT_POOL_TIMEOUT
+            ),
+            verify=False,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP client (called on application shutdown)"""
+    global _http_client
+    if _http_client is None:
+        return
+    await _http_client.aclose()
+    _http_client = None
+
+async def warm_up_http_client(url: str):
+    """Open a pooled connection to url's host at startup, so the first request skips the connection setup"""
+    try:
+        # Any response leaves the connection in the pool; the status is irrelevant
+        await get_http_client().head(url, timeout=2.0)
+        logger.info(f"HTTP client warmed up for {url}")
+    except Exception as e:
+        logger.warning(f"HTTP client warm-up for {url} failed: {e}")
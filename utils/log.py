@@ -1,5 +1,8 @@
 # app/utils/logger.py
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 class CustomLogger(logging.Logger):
     def danger(self, message, *args, **kwargs):
@@ -11,15 +14,39 @@ class CustomLogger(logging.Logger):
     def warn_custom(self, message, *args, **kwargs):
         self.warning(f"⚠️ {message}", *args, **kwargs)
 
+# Loggers only put records on this queue; a single background listener thread
+# formats them and writes them out, so emitting a log never blocks the event loop.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_listener: QueueListener = None
+
+def start_log_listener():
+    """Start the background thread that writes queued log records (idempotent)"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s || %(name)s || %(levelname)s || %(message)s')
+    handler.setFormatter(formatter)
+    _log_listener = QueueListener(_log_queue, handler, respect_handler_level=True)
+    _log_listener.start()
+
+def stop_log_listener():
+    """Flush pending log records and stop the background thread"""
+    global _log_listener
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    _log_listener = None
+
+atexit.register(stop_log_listener)
+
 def setup_logger(name: str):
     logging.setLoggerClass(CustomLogger)
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
     
     if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(asctime)s || %(name)s || %(levelname)s || %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        logger.addHandler(QueueHandler(_log_queue))
     
-    return logger
\ No newline at end of file
+    start_log_listener()
+    return logger
@@ -1,14 +1,19 @@
-from typing import TypeVar, Generic, List, Any, Dict
+from typing import TypeVar, Generic, List, Any, Dict, Optional
+from datetime import datetime
 from pydantic import BaseModel, Field
 from fastapi import Query
 
 T = TypeVar('T')
 
+# Upper bounds for list parameters; larger values are rejected with 422 before any DB work
+MAX_SKIP = 100_000
+MAX_LIMIT = 500
+
 
 class PaginationParams(BaseModel):
     """Reusable pagination parameters"""
-    skip: int = Field(0, ge=0, description="Number of records to skip")
-    limit: int = Field(100, ge=1, le=1000, description="Maximum number of records to return")
+    skip: int = Field(0, ge=0, le=MAX_SKIP, description="Number of records to skip")
+    limit: int = Field(100, ge=1, le=MAX_LIMIT, description="Maximum number of records to return")
     
     @property
     def offset(self) -> int:
@@ -39,9 +44,15 @@ class PaginatedResponse(BaseModel, Generic[T]):
         return (self.total + self.limit - 1) // self.limit if self.limit > 0 else 1
 
 
+class KeysetParams(BaseModel):
+    """Reusable keyset (cursor) pagination parameters"""
+    after_updated_at: Optional[datetime] = Field(None, description="updated_at of the last item of the previous page")
+    after_id: Optional[int] = Field(None, description="id of the last item of the previous page")
+
+
 def get_pagination_params(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return")
+    skip: int = Query(0, ge=0, le=MAX_SKIP, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT, description="Maximum number of records to return")
 ) -> PaginationParams:
     """
     FastAPI dependency for pagination parameters.
@@ -55,6 +66,39 @@ def get_pagination_params(
     return PaginationParams(skip=skip, limit=limit)
 
 
+def get_keyset_params(
+    after_updated_at: Optional[datetime] = Query(None, description="updated_at of the last item of the previous page"),
+    after_id: Optional[int] = Query(None, description="id of the last item of the previous page")
+) -> KeysetParams:
+    """
+    FastAPI dependency for keyset (cursor) pagination parameters.
+    
+    When both values are provided the list is resumed right after that item
+    instead of using OFFSET, so deep pages cost the same as the first one.
+    """
+    return KeysetParams(after_updated_at=after_updated_at, after_id=after_id)
+
+
+def build_next_cursor(items: List[Dict[str, Any]], limit: int) -> Optional[Dict[str, Any]]:
+    """
+    Build the cursor for the next page from the last formatted item.
+    
+    Args:
+        items: Formatted items of the current page (must expose "id" and "updated_at")
+        limit: Maximum items per page
+    
+    Returns:
+        Dictionary with after_updated_at/after_id, or None when there is no next page
+    """
+    if not items or len(items) < limit:
+        return None
+    last_item = items[-1]
+    return {
+        "after_updated_at": last_item.get("updated_at"),
+        "after_id": last_item.get("id")
+    }
+
+
 def create_paginated_response(
     items: List[Any],
     total: int,
@@ -1,14 +1,104 @@
-from typing import Any, Dict, Optional
-from fastapi.responses import JSONResponse
-from schemas.schema import ResponseModel
+from typing import Any, AsyncIterator, Dict, Optional
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic_core import to_jsonable_python
 
 
-def success_response(data:Any = None, message:Optional[str] = None, status_code:int = 200) -> JSONResponse:
-    response = ResponseModel(status="success", message=message, data=data, status_code=status_code)
-    return JSONResponse(content=response.dict(), status_code=status_code)
+def _json_default(value: Any) -> Any:
+    """Fallback for types orjson does not handle natively (models, Decimal, sets, bytes, timedelta...), encoded as Pydantic's JSON mode does"""
+    return to_jsonable_python(value)
 
-def fail_response(message:Optional[str] = None, status_code:int = 400) -> JSONResponse:
-    response = ResponseModel(status="fail", message=message, data=None, status_code=status_code)
-    return JSONResponse(content=response.dict(), status_code=status_code)
+class APIResponse(ORJSONResponse):
+    """ORJSONResponse that also encodes Pydantic models, Decimal and other leftovers in the payload"""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
 
 
+# The envelope has the shape of schemas.schema.ResponseModel (still the routes' response_model for the
+# OpenAPI schema) but is built as a plain dict: handlers return the response directly, so FastAPI never
+# validates it and there is no need to build and dump a Pydantic model per response
+def success_response(data:Any = None, message:Optional[str] = None, status_code:int = 200) -> APIResponse:
+    return APIResponse(content={"status": "success", "data": data, "message": message, "status_code": status_code}, status_code=status_code)
+
+def fail_response(message:Optional[str] = None, status_code:int = 400) -> APIResponse:
+    return APIResponse(content={"status": "fail", "data": None, "message": message, "status_code": status_code}, status_code=status_code)
+
+# Marks an iterator that ended before yielding anything
+_EXHAUSTED = object()
+
+async def prefetch_first(items: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """
+    Advance items to its first element before the response is built, and return an iterator over all of them.
+
+    Opening the DB session and running the query happen on that first step, so their errors are raised
+    in the handler and go through the normal error responses, instead of cutting off a 200 body already sent.
+    """
+    iterator = items.__aiter__()
+    try:
+        first = await iterator.__anext__()
+    except StopAsyncIteration:
+        first = _EXHAUSTED
+    
+    async def chained():
+        if first is _EXHAUSTED:
+            return
+        yield first
+        async for item in iterator:
+            yield item
+    return chained()
+
+async def stream_list_response(key: str, items: AsyncIterator[Dict[str, Any]], limit: int, extra: Optional[Dict[str, Any]] = None, message: Optional[str] = None) -> StreamingResponse:
+    """
+    Stream a success envelope whose data[key] list is serialized item by item.
+    The first item is fetched before returning (see prefetch_first), so query errors still produce the 500 envelope.
+    
+    Args:
+        key: Name of the list inside data
+        items: Formatted items (must expose "id" and "updated_at" for the next cursor)
+        limit: Page size, used to decide whether a next_cursor is emitted
+        extra: Additional data fields, written after the list
+        message: Envelope message
+    
+    Returns:
+        StreamingResponse with the same JSON shape as success_response
+    """
+    items = await prefetch_first(items)
+    
+    async def body():
+        yield b'{"status":"success","data":{' + orjson.dumps(key) + b':['
+        count = 0
+        last_item = None
+        async for item in items:
+            yield (b"," if count else b"") + orjson.dumps(item, default=_json_default)
+            last_item = item
+            count += 1
+        tail = dict(extra or {})
+        tail["next_cursor"] = {"after_updated_at": last_item.get("updated_at"), "after_id": last_item.get("id")} if count and count >= limit else None
+        # Drop the outer braces of the tail objects to splice them into the open envelope
+        yield b"]," + orjson.dumps(tail, default=_json_default)[1:-1] + b"}," + orjson.dumps({"message": message, "status_code": 200})[1:]
+    
+    return StreamingResponse(body(), media_type="application/json")
+
+# =============================================================================
+# CONDITIONAL GET
+# =============================================================================
+
+def is_not_modified(request: Request, etag: Optional[str]) -> bool:
+    """Check whether the client's If-None-Match header already holds etag"""
+    if etag is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+def not_modified_response(etag: str, max_age: int) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": f"private, max-age={max_age}"})
+
+def with_cache_headers(response: Response, etag: Optional[str], max_age: int) -> Response:
+    """Attach ETag and private Cache-Control headers to a response (no-op without an ETag)"""
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = f"private, max-age={max_age}"
+    return response